@@ -15,6 +15,10 @@ import hashlib
 
 router = APIRouter(prefix="/api/v1/rescheduling", tags=["rescheduling"])
 
+# Scheduled quantity strings, e.g. "Process(3/10pcs, Today: 2pcs)" or "Process(3/10pcs)"
+_PROCESS_TODAY_QTY_RE = re.compile(r'Process\((\d+)/(\d+)pcs, Today: (\d+)pcs\)')
+_PROCESS_QTY_RE = re.compile(r'Process\((\d+)/(\d+)pcs\)')
+
 
 def adjust_to_shift_hours(time: datetime) -> datetime:
     """Adjust time to fit within shift hours (6 AM to 5 PM)"""
@@ -794,13 +798,13 @@ async def dynamic_reschedule():
                     today_qty = 1
 
                     if "Process" in quantity_str:
-                        match = re.search(r'Process\((\d+)/(\d+)pcs, Today: (\d+)pcs\)', quantity_str)
+                        match = _PROCESS_TODAY_QTY_RE.search(quantity_str)
                         if match:
                             current_qty = int(match.group(1))
                             total_qty = int(match.group(2))
                             today_qty = int(match.group(3))
                         else:
-                            match = re.search(r'Process\((\d+)/(\d+)pcs\)', quantity_str)
+                            match = _PROCESS_QTY_RE.search(quantity_str)
                             if match:
                                 current_qty = int(match.group(1))
                                 total_qty = int(match.group(2))
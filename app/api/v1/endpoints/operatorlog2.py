@@ -2,7 +2,8 @@ from pydantic import BaseModel
 from datetime import datetime, timedelta
 from typing import Optional, List, Any, Dict
 from fastapi import APIRouter, HTTPException, Query
-from pony.orm import db_session, commit, select, desc
+from collections import defaultdict
+from pony.orm import db_session, commit, select, desc, count
 
 from app.api.v1.endpoints.dynamic_rescheduling import dynamic_reschedule
 from app.models import ProductionLog, User, Operation, ScheduleVersion, Machine, PlannedScheduleItem, Order, WorkCenter
@@ -41,61 +42,97 @@ def validate_operation_sequence(operation_id: int) -> tuple[bool, str]:
     Validates if the operation can be logged based on sequence and work center schedulability.
     Returns (can_log: bool, reason: str) tuple.
     """
-    try:
-        # Get the current operation
-        current_operation = Operation.get(id=operation_id)
-        if not current_operation:
-            return False, "Operation not found"
+    return validate_operation_sequence_bulk([operation_id])[operation_id]
 
-        # Check if work center is schedulable
-        work_center = current_operation.work_center
-        if not work_center.is_schedulable:
-            return False, f"Work center '{work_center.work_center_name or work_center.code}' is not schedulable"
 
-        # Get the order for this operation
-        order = current_operation.order
-        current_op_number = current_operation.operation_number
+def validate_operation_sequence_bulk(operation_ids: Optional[List[int]]) -> Dict[int, tuple[bool, str]]:
+    """
+    Validates a batch of operations based on sequence and work center schedulability,
+    with a fixed number of queries instead of several per operation.
+    Pass None to validate every operation with unfiltered queries, as the all-orders scans do,
+    rather than an IN-list of every operation id.
+    Returns {operation_id: (can_log, reason)}.
+    """
+    if operation_ids is not None and not operation_ids:
+        return {}
 
-        # Get all operations for this order, ordered by operation_number
-        all_operations = select(op for op in Operation if op.order == order).order_by(Operation.operation_number)
+    try:
+        # Only the columns the sequence rules need, for every operation of the affected orders,
+        # and the completed quantity and number of logs per operation
+        if operation_ids is None:
+            operation_rows = select(
+                (op.id, op.order.id, op.operation_number, op.order.required_quantity,
+                 op.work_center.is_schedulable, op.work_center.work_center_name, op.work_center.code)
+                for op in Operation
+            )
+            log_rows = select(
+                (log.operation.id, sum(log.quantity_completed), count(log))
+                for log in ProductionLog
+            )
+        else:
+            order_ids = list(select(op.order.id for op in Operation if op.id in operation_ids))
+            operation_rows = select(
+                (op.id, op.order.id, op.operation_number, op.order.required_quantity,
+                 op.work_center.is_schedulable, op.work_center.work_center_name, op.work_center.code)
+                for op in Operation if op.order.id in order_ids
+            )
+            log_rows = select(
+                (log.operation.id, sum(log.quantity_completed), count(log))
+                for log in ProductionLog if log.operation.order.id in order_ids
+            )
+
+        ops_by_order = defaultdict(list)
+        operations = {}
+        for row in operation_rows:
+            operations[row[0]] = row
+            ops_by_order[row[1]].append(row)
 
-        # Check if this is the first operation (operation_number = 1 or the lowest)
-        first_operation = min(op.operation_number for op in all_operations)
-        if current_op_number == first_operation:
-            return True, "Valid - First operation"
+        log_totals = {
+            op_id: (total_completed or 0, log_count)
+            for op_id, total_completed, log_count in log_rows
+        }
 
-        # Find all previous operations that should be completed before this one
-        previous_operations = select(op for op in Operation
-                                     if op.order == order and op.operation_number < current_op_number)
+        def validate(operation):
+            _, order_id, current_op_number, required_quantity, is_schedulable, work_center_name, work_center_code = operation
+            if not is_schedulable:
+                return False, f"Work center '{work_center_name or work_center_code}' is not schedulable"
 
-        # Check if all previous operations have production logs with completed quantities
-        for prev_op in previous_operations:
-            # Check if the previous operation's work center is schedulable
-            if not prev_op.work_center.is_schedulable:
-                continue  # Skip non-schedulable operations in sequence check
+            order_operations = ops_by_order[order_id]
 
-            # Check if there are any production logs for this previous operation
-            prev_logs = select(log for log in ProductionLog if log.operation == prev_op)
+            first_operation = min(op[2] for op in order_operations)
+            if current_op_number == first_operation:
+                return True, "Valid - First operation"
 
-            if not prev_logs.exists():
-                # No logs found for a previous operation
-                return False, f"Previous operation {prev_op.operation_number} has no production logs"
+            previous_operations = sorted(
+                (op for op in order_operations if op[2] < current_op_number),
+                key=lambda op: op[2]
+            )
+            for prev_id, _, prev_op_number, _, prev_is_schedulable, _, _ in previous_operations:
+                # Skip non-schedulable operations in sequence check
+                if not prev_is_schedulable:
+                    continue
 
-            # Check if the previous operation has sufficient completed quantity
-            total_completed = sum(log.quantity_completed or 0 for log in prev_logs)
+                total_completed, log_count = log_totals.get(prev_id, (0, 0))
+                if not log_count:
+                    return False, f"Previous operation {prev_op_number} has no production logs"
 
-            # Get the required quantity from the order
-            required_quantity = order.required_quantity
+                if total_completed < required_quantity:
+                    return False, f"Previous operation {prev_op_number} is incomplete ({total_completed}/{required_quantity})"
 
-            # If the previous operation doesn't have enough completed quantity, reject
-            if total_completed < required_quantity:
-                return False, f"Previous operation {prev_op.operation_number} is incomplete ({total_completed}/{required_quantity})"
+            return True, "Valid - All previous operations completed"
 
-        return True, "Valid - All previous operations completed"
+        return {
+            operation_id: validate(operations[operation_id]) if operation_id in operations else (False, "Operation not found")
+            for operation_id in (operations if operation_ids is None else operation_ids)
+        }
 
     except Exception as e:
-        print(f"Error in operation sequence validation: {e}")
-        return False, f"Validation error: {str(e)}"
+        print(f"Error in bulk operation sequence validation: {e}")
+        failure = (False, f"Validation error: {str(e)}")
+        if operation_ids is None:
+            # Every operation the caller looks up fails validation
+            return defaultdict(lambda: failure)
+        return {operation_id: failure for operation_id in operation_ids}
 
 
 def get_operation_sequence_info(operation_id: int) -> Dict:
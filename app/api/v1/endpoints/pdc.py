@@ -1,284 +1,450 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from pony.orm import db_session, select, desc
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Header, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pony.orm import db_session, select, left_join, count
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional, Set, Tuple
+from datetime import datetime
+import pandas as pd
 import asyncio
+import logging
+import orjson
 import re
-from concurrent.futures import ThreadPoolExecutor
 import time
+from collections import defaultdict
 from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
 
 from app.api.v1.endpoints.dynamic_rescheduling import get_combined_schedule
-from app.api.v1.endpoints.operatorlog2 import validate_operation_sequence
-from app.models import ScheduleVersion, Order, Operation, ProductionLog
+from app.api.v1.endpoints.operatorlog2 import validate_operation_sequence_bulk
+from app.models import Order, Operation, ProductionLog
 
 router = APIRouter(prefix="/api/v1/scheduling", tags=["scheduling"])
 
-# Thread pool for database operations
-executor = ThreadPoolExecutor(max_workers=8)
+logger = logging.getLogger(__name__)
 
-# Simple in-memory cache
-_cache = {}
-_cache_timeout = {}
+# Simple in-memory cache: key -> (value, soft_expiry, hard_expiry)
+# Between the soft and hard expiry the stale value is served while a refresh runs in the background
+_cache: Dict[str, Tuple[Any, float, float]] = {}
 CACHE_TTL = 300  # 5 minutes
+CACHE_STALE_TTL = 900  # serve stale data for up to 15 minutes while refreshing
+COMBINED_SCHEDULE_CACHE_KEY = "combined_schedule"
+
+# Guards cache checks and in-flight refresh registration so concurrent requests share one fetch
+_cache_lock = asyncio.Lock()
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def get_cache_entry(key: str, now: float):
+    """Get (value, soft_expiry, hard_expiry) from cache unless past its hard expiry"""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+
+    if now < entry[2]:
+        return entry
+
+    # Clean expired cache
+    _cache.pop(key, None)
+    return None
 
 
 def get_from_cache(key: str):
     """Get data from cache if not expired"""
-    if key in _cache and key in _cache_timeout:
-        if time.time() < _cache_timeout[key]:
-            return _cache[key]
-        else:
-            # Clean expired cache
-            _cache.pop(key, None)
-            _cache_timeout.pop(key, None)
+    now = time.time()
+    entry = get_cache_entry(key, now)
+    if entry is not None and now < entry[1]:
+        return entry[0]
     return None
 
 
-def set_cache(key: str, value, ttl: int = CACHE_TTL):
+def set_cache(key: str, value, ttl: int = CACHE_TTL, stale_ttl: int = CACHE_STALE_TTL):
     """Set data in cache with TTL"""
-    _cache[key] = value
-    _cache_timeout[key] = time.time() + ttl
+    now = time.time()
+    _cache[key] = (value, now + ttl, now + stale_ttl)
 
 
-async def get_combined_schedule_cached():
-    # """Get combined schedule with caching"""
-    # cache_key = "combined_schedule"
-    # cached_data = get_from_cache(cache_key)
-    #
-    # if cached_data is not None:
-    #     return cached_data
-
-    # If not in cache, fetch from source
+async def _refresh_combined_schedule(cache_key: str):
+    """Fetch the combined schedule from source and store it in the cache"""
     try:
         combined_data = await get_combined_schedule()
-        # set_cache(cache_key, combined_data)
+        set_cache(cache_key, combined_data)
         return combined_data
     except Exception as e:
-        # If main call fails, try to return stale cache data if available
-        # if cache_key in _cache:
-        #     return _cache[cache_key]
-        raise e
+        logger.error("Error refreshing combined schedule: %s", e)
+        raise
+    finally:
+        _inflight.pop(cache_key, None)
+
+
+def _ignore_background_refresh_error(task: asyncio.Task):
+    """Mark a background refresh's exception as retrieved; it was already logged"""
+    if not task.cancelled():
+        task.exception()
+
+
+def filter_combined_schedule(combined_data, part_number: str, production_order: str):
+    """Narrow the combined schedule to a single part number and production order"""
+    # The schedule has to be computed for every order since they compete for machines,
+    # so the narrowing happens here, before any per-part processing
+    return combined_data.model_copy(update={
+        "reschedule": [
+            update for update in combined_data.reschedule
+            if update.part_number == part_number and update.production_order == production_order
+        ],
+        "scheduled_operations": [
+            op for op in combined_data.scheduled_operations
+            if op.component == part_number and op.production_order == production_order
+        ],
+        "production_logs": [
+            log for log in combined_data.production_logs
+            if log.part_number == part_number and log.production_order == production_order
+        ],
+    })
+
+
+async def get_combined_schedule_cached(part_number: Optional[str] = None, production_order: Optional[str] = None):
+    """Get combined schedule with caching, optionally narrowed to one part number and production order"""
+    cache_key = COMBINED_SCHEDULE_CACHE_KEY
+    now = time.time()
+
+    async with _cache_lock:
+        entry = get_cache_entry(cache_key, now)
+        refresh = _inflight.get(cache_key)
+        if (entry is None or now >= entry[1]) and refresh is None:
+            # Single-flight: only the first caller starts a refresh, the rest await the same task
+            refresh = asyncio.ensure_future(_refresh_combined_schedule(cache_key))
+            _inflight[cache_key] = refresh
+            if entry is not None:
+                # Stale-while-revalidate: nobody awaits this refresh, callers keep getting the stale value
+                refresh.add_done_callback(_ignore_background_refresh_error)
+
+    if entry is not None:
+        combined_data = entry[0]
+    else:
+        # Shield so one cancelled request doesn't cancel the fetch for everyone else
+        combined_data = await asyncio.shield(refresh)
 
+    if combined_data and part_number is not None and production_order is not None:
+        combined_data = filter_combined_schedule(combined_data, part_number, production_order)
+    return combined_data
 
-def process_reschedule_data_sync(reschedule_data):
-    """Synchronous processing of reschedule data"""
-    part_production_end_times = {}
-    data_sources = {}
 
+@lru_cache(maxsize=2048)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO timestamp (trailing 'Z' allowed); cached since shift-end times repeat across operations"""
+    if value.endswith('Z'):
+        return datetime.fromisoformat(value[:-1] + '+00:00')
+    return datetime.fromisoformat(value)
+
+
+def _parse_end_time(value) -> datetime:
+    """Parse an ISO end time string; datetimes pass through untouched"""
+    if not isinstance(value, str):
+        return value
+    return _parse_iso(value)
+
+
+# (part_number, production_order)
+PartKey = Tuple[str, str]
+# (component, production_order, end_time, description, quantity)
+ScheduledOpRow = Tuple[Optional[str], Optional[str], Any, Optional[str], Optional[str]]
+
+
+# Above this many rows the per-key max end time is computed with a pandas groupby
+PANDAS_GROUPBY_THRESHOLD = 500
+
+
+def _max_end_times_pandas(rows) -> Dict[PartKey, datetime]:
+    """Per-key max end time via a pandas groupby"""
+    df = pd.DataFrame(rows, columns=['part_number', 'production_order', 'end_time'])
+    latest = df.groupby(['part_number', 'production_order'], sort=False)['end_time'].max()
+    return {
+        key: end_time.to_pydatetime() if isinstance(end_time, pd.Timestamp) else end_time
+        for key, end_time in latest.items()
+    }
+
+
+def _max_end_times(rows) -> Dict[PartKey, datetime]:
+    """Latest end time per (part_number, production_order) from (part_number, production_order, end_time) rows"""
+    if len(rows) > PANDAS_GROUPBY_THRESHOLD:
+        try:
+            return _max_end_times_pandas(rows)
+        except (TypeError, ValueError):
+            # Mixed naive/aware timestamps can't be compared in bulk; use the row-wise path
+            pass
+
+    end_times: Dict[PartKey, datetime] = {}
+    for part_number, production_order, end_time in rows:
+        key = (part_number, production_order)
+        try:
+            if key not in end_times or end_time > end_times[key]:
+                end_times[key] = end_time
+        except TypeError as e:
+            logger.warning("Error comparing end times for %s: %s", key, e)
+    return end_times
+
+
+def process_reschedule_data_sync(reschedule_data) -> Dict[PartKey, datetime]:
+    """Synchronous processing of reschedule data"""
     if not reschedule_data:
-        return part_production_end_times, data_sources
+        return {}
 
-    for update in reschedule_data:
+    rows = []
+    # Read model fields straight from __dict__ instead of going through attribute access per field
+    for update in (u.__dict__ for u in reschedule_data):
         try:
-            part_number = getattr(update, 'part_number', None)
-            production_order = getattr(update, 'production_order', None)
-            end_time_str = getattr(update, 'end_time', None)
+            part_number = update.get('part_number')
+            production_order = update.get('production_order')
+            end_time = update.get('end_time')
 
-            if not all([part_number, production_order, end_time_str]):
+            if not all([part_number, production_order, end_time]):
                 continue
 
-            if isinstance(end_time_str, str):
-                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-            else:
-                end_time = end_time_str
-
-            key = (part_number, production_order)
-            if key not in part_production_end_times or end_time > part_production_end_times[key]:
-                part_production_end_times[key] = end_time
-                data_sources[key] = "reschedule"
+            rows.append((part_number, production_order, _parse_end_time(end_time)))
         except (ValueError, TypeError, AttributeError) as e:
-            print(f"Error processing reschedule update: {str(e)}")
+            logger.warning("Error processing reschedule update: %s", e)
             continue
 
-    return part_production_end_times, data_sources
+    return _max_end_times(rows)
 
 
-def process_scheduled_operations_sync(scheduled_operations, existing_end_times, existing_sources):
-    """Synchronous processing of scheduled operations"""
-    if not scheduled_operations:
-        return existing_end_times, existing_sources
+_SCHEDULED_OP_FIELDS = attrgetter('component', 'production_order', 'end_time', 'description', 'quantity')
 
-    local_end_times = existing_end_times.copy()
-    local_sources = existing_sources.copy()
 
-    for op in scheduled_operations:
-        try:
-            part_number = getattr(op, 'component', None)
-            production_order = getattr(op, 'production_order', None)
-            end_time = getattr(op, 'end_time', None)
+def build_scheduled_op_rows(scheduled_operations) -> List[ScheduledOpRow]:
+    """
+    Flatten scheduled operations into
+    (component, production_order, end_time, description, quantity) tuples
+    so the end-time and completion passes don't repeat attribute lookups.
+    """
+    return list(map(_SCHEDULED_OP_FIELDS, scheduled_operations))
+
 
+def process_scheduled_operations_sync(
+        scheduled_op_rows: List[ScheduledOpRow],
+        existing_end_times: Dict[PartKey, datetime]
+) -> Tuple[Dict[PartKey, datetime], Set[PartKey]]:
+    """Synchronous processing of scheduled operations; updates existing_end_times in place"""
+    # Every key present so far came from reschedule data, which takes precedence
+    reschedule_keys = set(existing_end_times)
+    if not scheduled_op_rows:
+        return existing_end_times, reschedule_keys
+
+    rows = []
+    for part_number, production_order, end_time, _, _ in scheduled_op_rows:
+        try:
             if not all([part_number, production_order, end_time]):
                 continue
 
-            if isinstance(end_time, str):
-                end_time = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-
+            # Reschedule data always wins over the planned schedule
             key = (part_number, production_order)
-            # Only update if this key doesn't already have reschedule data
-            if key not in local_end_times or (
-                    local_sources.get(key) != "reschedule" and end_time > local_end_times[key]
-            ):
-                local_end_times[key] = end_time
-                local_sources[key] = "scheduled"
+            if key in reschedule_keys:
+                continue
+
+            rows.append((*key, _parse_end_time(end_time)))
         except (ValueError, TypeError, AttributeError) as e:
-            print(f"Error processing scheduled operation: {str(e)}")
+            logger.warning("Error processing scheduled operation: %s", e)
             continue
 
-    return local_end_times, local_sources
+    # Keys are disjoint from the reschedule keys, so a plain update merges them
+    existing_end_times.update(_max_end_times(rows))
+
+    return existing_end_times, reschedule_keys
+
 
+_PROCESS_QTY_RE = re.compile(r'Process\(\d+/(\d+)pcs')
 
-def determine_completed_parts_sync(combined_data):
+
+def _planned_qty(quantity_str: Optional[str]) -> int:
+    """Planned quantity parsed from a scheduled operation's quantity string, 0 if absent"""
+    if isinstance(quantity_str, str) and "Process" in quantity_str:
+        match = _PROCESS_QTY_RE.search(quantity_str)
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def determine_completed_parts_sync(combined_data, scheduled_op_rows: List[ScheduledOpRow]) -> Set[PartKey]:
     """Synchronous determination of completed parts"""
-    completed_parts = set()
+    completed_parts: Set[PartKey] = set()
 
-    if not (hasattr(combined_data, 'production_logs') and combined_data.production_logs):
+    production_logs = getattr(combined_data, 'production_logs', None)
+    if not production_logs:
         return completed_parts
 
     try:
-        # Group logs by part efficiently
-        logs_by_part = {}
-        for log in combined_data.production_logs:
-            if not hasattr(log, 'part_number'):
-                continue
+        # Group logs by part efficiently; ProductionLogResponse always declares both key fields
+        get_log_key = attrgetter('part_number', 'production_order')
+        logs_by_part: Dict[PartKey, list] = defaultdict(list)
+        for log in production_logs:
+            logs_by_part[get_log_key(log)].append(log)
 
-            part_number = log.part_number
-            production_order = getattr(log, 'production_order', "")
-            part_key = (part_number, production_order)
-
-            if part_key not in logs_by_part:
-                logs_by_part[part_key] = []
-            logs_by_part[part_key].append(log)
-
-        # Get scheduled operations efficiently
-        scheduled_ops_by_part = {}
-        if hasattr(combined_data, 'scheduled_operations') and combined_data.scheduled_operations:
-            for op in combined_data.scheduled_operations:
-                if not (hasattr(op, 'component') and hasattr(op, 'production_order')):
-                    continue
+        # Group scheduled (description, quantity) pairs by part
+        scheduled_ops_by_part: Dict[PartKey, List[Tuple[Optional[str], Optional[str]]]] = defaultdict(list)
+        for part_number, production_order, _, description, quantity in scheduled_op_rows:
+            scheduled_ops_by_part[(part_number, production_order)].append((description, quantity))
 
-                part_key = (op.component, op.production_order)
-                if part_key not in scheduled_ops_by_part:
-                    scheduled_ops_by_part[part_key] = []
-                scheduled_ops_by_part[part_key].append(op)
+        # Nothing scheduled means nothing can be complete
+        if not scheduled_ops_by_part:
+            return completed_parts
 
         # Check completion status
         for part_key, logs in logs_by_part.items():
-            if part_key not in scheduled_ops_by_part:
+            if not logs or part_key not in scheduled_ops_by_part:
                 continue
 
             try:
-                total_operations = len(scheduled_ops_by_part[part_key])
-                completed_operations = len(set(
-                    getattr(log, 'operation_description', '') for log in logs
-                    if hasattr(log, 'operation_description') and log.operation_description
-                ))
+                # Sum completed quantities per operation description in one pass;
+                # the keys double as the set of logged operations
+                completed_by_desc: Dict[str, int] = defaultdict(int)
+                for log in logs:
+                    description = log.operation_description
+                    if description:
+                        completed_by_desc[description] += log.quantity_completed or 0
 
-                if completed_operations < total_operations:
+                if len(completed_by_desc) < len(scheduled_ops_by_part[part_key]):
                     continue
 
-                # Quick quantity check
-                all_quantities_completed = True
-                for op in scheduled_ops_by_part[part_key]:
-                    planned_qty = 0
-                    quantity_str = getattr(op, 'quantity', '')
-
-                    if isinstance(quantity_str, str) and "Process" in quantity_str:
-                        match = re.search(r'Process\(\d+/(\d+)pcs', quantity_str)
-                        if match:
-                            planned_qty = int(match.group(1))
-
-                    op_description = getattr(op, 'description', None)
-                    if not op_description or planned_qty == 0:
-                        continue
-
-                    completed_qty = sum(
-                        getattr(log, 'quantity_completed', 0) for log in logs
-                        if (hasattr(log, 'operation_description') and
-                            hasattr(log, 'quantity_completed') and
-                            log.operation_description == op_description)
-                    )
-
-                    if completed_qty < planned_qty:
-                        all_quantities_completed = False
-                        break
+                # Quick quantity check, stops at the first operation that falls short
+                all_quantities_completed = all(
+                    not description
+                    or completed_by_desc.get(description, 0) >= _planned_qty(quantity)
+                    for description, quantity in scheduled_ops_by_part[part_key]
+                )
 
                 if all_quantities_completed:
                     completed_parts.add(part_key)
 
             except Exception as e:
-                print(f"Error checking completion for {part_key}: {str(e)}")
+                logger.warning("Error checking completion for %s: %s", part_key, e)
                 continue
 
     except Exception as e:
-        print(f"Error in determine_completed_parts_sync: {str(e)}")
+        logger.error("Error in determine_completed_parts_sync: %s", e)
 
     return completed_parts
 
 
-def get_active_parts_sync(combined_data):
+def get_active_parts_sync(combined_data) -> Set[PartKey]:
     """Synchronous extraction of active parts"""
-    active_parts = set()
+    active_parts: Set[PartKey] = set()
 
-    if not (hasattr(combined_data, 'active_parts') and combined_data.active_parts):
+    parts = getattr(combined_data, 'active_parts', None)
+    if not parts:
         return active_parts
 
     try:
-        for part in combined_data.active_parts:
-            if (hasattr(part, 'part_number') and
-                    hasattr(part, 'production_order') and
-                    getattr(part, 'status', None) == 'active'):
-                active_parts.add((part.part_number, part.production_order))
+        for part in parts:
+            try:
+                if part.status == 'active':
+                    active_parts.add((part.part_number, part.production_order))
+            except AttributeError:
+                continue
     except Exception as e:
-        print(f"Error extracting active parts: {str(e)}")
+        logger.error("Error extracting active parts: %s", e)
 
     return active_parts
 
 
 async def process_all_data(combined_data):
-    """Process all data using thread pool"""
-    loop = asyncio.get_event_loop()
-
-    # Create all tasks for parallel execution
-    tasks = [
-        loop.run_in_executor(executor, get_active_parts_sync, combined_data),
-        loop.run_in_executor(executor, determine_completed_parts_sync, combined_data)
-    ]
-
-    # Add reschedule processing if data exists
-    reschedule_data = getattr(combined_data, 'reschedule', None)
-    if reschedule_data:
-        tasks.append(
-            loop.run_in_executor(executor, process_reschedule_data_sync, reschedule_data)
-        )
+    """Process all data in a single worker thread"""
+    # The steps are pure-Python CPU work that holds the GIL, so fanning them out
+    # across threads only adds switching overhead; one hop off the event loop is enough
+    return await run_in_threadpool(process_all_data_sync, combined_data)
 
-    # Execute all tasks concurrently
-    if reschedule_data:
-        active_parts, completed_parts, (part_production_end_times, data_sources) = await asyncio.gather(*tasks)
-    else:
-        active_parts, completed_parts = await asyncio.gather(*tasks)
-        part_production_end_times, data_sources = {}, {}
-
-    # Process scheduled operations
-    scheduled_operations = getattr(combined_data, 'scheduled_operations', None)
-    if scheduled_operations:
-        part_production_end_times, data_sources = await loop.run_in_executor(
-            executor,
-            process_scheduled_operations_sync,
-            scheduled_operations,
-            part_production_end_times,
-            data_sources
+
+def process_all_data_sync(combined_data):
+    """Synchronous processing of all PDC inputs"""
+    scheduled_ops = getattr(combined_data, 'scheduled_operations', None) or []
+    scheduled_op_rows = build_scheduled_op_rows(scheduled_ops)
+
+    active_parts = get_active_parts_sync(combined_data)
+    completed_parts = determine_completed_parts_sync(combined_data, scheduled_op_rows)
+    part_production_end_times = process_reschedule_data_sync(getattr(combined_data, 'reschedule', None))
+    part_production_end_times, reschedule_keys = process_scheduled_operations_sync(
+        scheduled_op_rows,
+        part_production_end_times
+    )
+
+    return active_parts, completed_parts, part_production_end_times, reschedule_keys
+
+
+# (part_number, production_order, pdc, status, data_source)
+PdcRow = Tuple[str, str, Optional[datetime], str, str]
+
+# Rows serialized per chunk when streaming the PDC response
+PDC_STREAM_CHUNK_SIZE = 500
+
+
+def _build_pdc_rows(combined_data, target: Optional[PartKey] = None) -> List[PdcRow]:
+    """
+    Build the sorted PDC rows; pure CPU work, run in a worker thread.
+    With a target (part_number, production_order) only that key's row is built.
+    """
+    active_parts, completed_parts, part_production_end_times, reschedule_keys = process_all_data_sync(combined_data)
+
+    def make_row(key, pdc):
+        return (
+            key[0],
+            key[1],
+            pdc,
+            "completed" if key in completed_parts else "in_progress",
+            "reschedule" if key in reschedule_keys else "scheduled"
         )
 
-    return active_parts, completed_parts, part_production_end_times, data_sources
+    if target is not None:
+        if target in part_production_end_times:
+            return [make_row(target, part_production_end_times[target])]
+        if target in active_parts:
+            return [(target[0], target[1], None, "pending", "none")]
+        return []
+
+    # Keys are unique, so a plain tuple sort orders by part number and production order
+    rows = [make_row(key, pdc) for key, pdc in part_production_end_times.items()]
+
+    # Add active parts without PDC data
+    rows.extend(
+        (pn, po, None, "pending", "none")
+        for pn, po in active_parts.difference(part_production_end_times)
+    )
 
+    rows.sort()
+    return rows
 
-@router.get("/part-production-pdc", response_model=List[Dict[str, Any]])
+
+def _pdc_row_to_dict(row: PdcRow) -> Dict[str, Any]:
+    """Response shape of a single PDC row"""
+    pn, po, pdc, status, data_source = row
+    return {
+        "part_number": pn,
+        "production_order": po,
+        # orjson serializes datetimes natively
+        "pdc": pdc if pdc is None or isinstance(pdc, datetime) else str(pdc),
+        "status": status,
+        "data_source": data_source
+    }
+
+
+async def _stream_pdc_json(rows: List[PdcRow]):
+    """Yield the rows as one JSON array, serialized a chunk at a time"""
+    yield b"["
+    for start in range(0, len(rows), PDC_STREAM_CHUNK_SIZE):
+        chunk = b",".join(
+            orjson.dumps(_pdc_row_to_dict(row)) for row in rows[start:start + PDC_STREAM_CHUNK_SIZE]
+        )
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]"
+
+
+@router.get("/part-production-pdc", response_class=ORJSONResponse, response_model=None)
 async def get_part_production_pdc():
     """
     Get the Probable Date of Completion (PDC) for each part number and production order.
 
     Optimized for performance with caching, parallel processing, and proper async handling.
+    The sorted rows are streamed as a JSON array instead of being serialized in one piece.
     """
     start_time = time.time()
 
@@ -289,47 +455,16 @@ async def get_part_production_pdc():
         if not combined_data:
             return []
 
-        # Step 2: Process all data in parallel
-        active_parts, completed_parts, part_production_end_times, data_sources = await process_all_data(combined_data)
-
-        # Step 3: Build result efficiently
-        result = []
-        processed_parts = set()
-
-        # Add parts with PDC data
-        for (part_number, production_order), pdc in part_production_end_times.items():
-            result.append({
-                "part_number": part_number,
-                "production_order": production_order,
-                "pdc": pdc.isoformat() if isinstance(pdc, datetime) else str(pdc),
-                "status": "completed" if (part_number, production_order) in completed_parts else "in_progress",
-                "data_source": data_sources.get((part_number, production_order), "unknown")
-            })
-            processed_parts.add((part_number, production_order))
-
-        # Add active parts without PDC data
-        missing_active_parts = active_parts - processed_parts
-        for part_number, production_order in missing_active_parts:
-            result.append({
-                "part_number": part_number,
-                "production_order": production_order,
-                "pdc": None,
-                "status": "pending",
-                "data_source": "none"
-            })
-
-        # Sort result
-        result.sort(key=lambda x: (x["part_number"], x["production_order"]))
+        # Step 2: Process and sort the rows off the event loop
+        rows = await run_in_threadpool(_build_pdc_rows, combined_data)
 
         end_time = time.time()
-        print(f"PDC endpoint completed in {end_time - start_time:.2f} seconds")
+        logger.info("PDC endpoint completed in %.2f seconds", end_time - start_time)
 
-        return result
+        return StreamingResponse(_stream_pdc_json(rows), media_type="application/json")
 
     except Exception as e:
-        print(f"Error retrieving PDC data: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error retrieving PDC data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error calculating PDC: {str(e)}"
@@ -337,242 +472,105 @@ async def get_part_production_pdc():
 
 
 
-
-from fastapi import HTTPException
-from typing import List, Dict, Any
-from datetime import datetime
-import time
-import traceback
-
-# @router.get("/part-production-pdc12", response_model=List[Dict[str, Any]])
-# async def get_part_production_pdc(part_number: str, production_order: str):
-#     """
-#     Get the Probable Date of Completion (PDC) for a specific part number and production order.
-#     """
-#     start_time = time.time()
-#     print(f"Received request with part_number={part_number}, production_order={production_order}")
-#
-#     try:
-#         # Step 1: Get combined data (with caching)
-#         combined_data = await get_combined_schedule_cached()
-#
-#         # DEBUG: log type and attributes of the response
-#         print(f"Combined data type: {type(combined_data)}")
-#
-#         if hasattr(combined_data, '__dict__'):
-#             print("Combined data fields:")
-#             for key, value in combined_data.__dict__.items():
-#                 if isinstance(value, list):
-#                     print(f"  - {key}: list of {len(value)} items")
-#                 else:
-#                     print(f"  - {key}: {type(value).__name__}")
-#         else:
-#             print(f"Combined data raw: {combined_data}")
-#
-#         # Optional: check if a known attribute exists and print length
-#         if hasattr(combined_data, 'schedules'):
-#             print(f"Schedules count: {len(combined_data.schedules)}")
-#         elif hasattr(combined_data, 'items'):
-#             print(f"Items count: {len(combined_data.items)}")
-#
-#         # Step 2: Process all data in parallel
-#         active_parts, completed_parts, part_production_end_times, data_sources = await process_all_data(combined_data)
-#         print(f"Processed data - active_parts: {len(active_parts)}, completed_parts: {len(completed_parts)}, "
-#               f"part_production_end_times: {len(part_production_end_times)}")
-#
-#         # Step 3: Filter for the specific part and production order
-#         result = []
-#         target_key = (part_number, production_order)
-#         print(f"Looking up target_key: {target_key}")
-#
-#         if target_key in part_production_end_times:
-#             pdc = part_production_end_times[target_key]
-#             print(f"Found PDC for {target_key}: {pdc}")
-#             result.append({
-#                 "part_number": part_number,
-#                 "production_order": production_order,
-#                 "pdc": pdc.isoformat() if isinstance(pdc, datetime) else str(pdc),
-#                 "status": "completed" if target_key in completed_parts else "in_progress",
-#                 "data_source": data_sources.get(target_key, "unknown")
-#             })
-#         elif target_key in active_parts:
-#             print(f"{target_key} is active but no PDC data available.")
-#             result.append({
-#                 "part_number": part_number,
-#                 "production_order": production_order,
-#                 "pdc": None,
-#                 "status": "pending",
-#                 "data_source": "none"
-#             })
-#         else:
-#             print(f"DEBUG: {target_key} not found in either part_production_end_times or active_parts — returning empty list")
-#
-#         end_time = time.time()
-#         print(f"PDC endpoint completed in {end_time - start_time:.2f} seconds. Result count: {len(result)}")
-#
-#         return result
-#
-#     except Exception as e:
-#         print(f"Error retrieving PDC data: {str(e)}")
-#         traceback.print_exc()
-#         raise HTTPException(
-#             status_code=500,
-#             detail=f"Error calculating PDC: {str(e)}"
-#         )
-
 """CURRENT PDC """
-@router.get("/part-production-pdc12", response_model=List[Dict[str, Any]])
+@router.get("/part-production-pdc12", response_class=ORJSONResponse, response_model=None)
 async def get_filtered_part_production(part_number: str, production_order: str):
     """
     Get filtered production data for a specific part number and production order.
     Returns all matching records from the combined schedule data.
     """
     start_time = time.time()
-    print(f"Received filtered request with part_number={part_number}, production_order={production_order}")
+    logger.debug("Received filtered request with part_number=%s, production_order=%s", part_number, production_order)
 
     try:
         # Step 1: Get combined data (with caching)
-        combined_data = await get_combined_schedule_cached()
+        combined_data = await get_combined_schedule_cached(part_number, production_order)
 
-        print(f"Combined data type: {type(combined_data)}")
+        logger.debug("Combined data type: %s", type(combined_data))
 
         # Step 2: Process all data in parallel
-        active_parts, completed_parts, part_production_end_times, data_sources = await process_all_data(combined_data)
-        print(f"Processed data - active_parts: {len(active_parts)}, completed_parts: {len(completed_parts)}, "
-              f"part_production_end_times: {len(part_production_end_times)}")
+        active_parts, completed_parts, part_production_end_times, reschedule_keys = await process_all_data(combined_data)
+        logger.debug("Processed data - active_parts: %d, completed_parts: %d, part_production_end_times: %d",
+                     len(active_parts), len(completed_parts), len(part_production_end_times))
 
-        # Step 3: Filter all data for the specific part and production order
+        # Step 3: Look up the requested key directly
         result = []
+        target = (part_number, production_order)
+        is_active = target in active_parts
+        is_completed = target in completed_parts
+        pdc = part_production_end_times.get(target)
 
-        # Filter active parts
-        matching_active = [
-            key for key in active_parts
-            if key[0] == part_number and key[1] == production_order
-        ]
-
-        # Filter completed parts
-        matching_completed = [
-            key for key in completed_parts
-            if key[0] == part_number and key[1] == production_order
-        ]
-
-        # Filter part production end times
-        matching_end_times = {
-            key: value for key, value in part_production_end_times.items()
-            if key[0] == part_number and key[1] == production_order
-        }
-
-        print(f"Found {len(matching_active)} active, {len(matching_completed)} completed, "
-              f"{len(matching_end_times)} with end times")
-
-        # Step 4: Build result from all matching data
-        all_matching_keys = set(matching_active + matching_completed + list(matching_end_times.keys()))
-
-        for key in all_matching_keys:
-            part_num, prod_order = key
+        logger.debug("Target %s - active: %s, completed: %s, has end time: %s",
+                     target, is_active, is_completed, pdc is not None)
 
+        # Step 4: Build the single matching row, if any
+        if is_active or is_completed or pdc is not None:
             # Determine status
-            if key in completed_parts:
+            if is_completed:
                 status = "completed"
-            elif key in active_parts:
+            elif is_active:
                 status = "in_progress"
             else:
                 status = "pending"
 
-            # Get PDC if available
-            pdc = matching_end_times.get(key)
-            pdc_value = pdc.isoformat() if isinstance(pdc, datetime) else str(pdc) if pdc else None
-
             result.append({
-                "part_number": part_num,
-                "production_order": prod_order,
-                "pdc": pdc_value,
+                "part_number": part_number,
+                "production_order": production_order,
+                "pdc": pdc if pdc is None or isinstance(pdc, datetime) else str(pdc),
                 "status": status,
-                "data_source": data_sources.get(key, "unknown")
+                "data_source": (
+                    "reschedule" if target in reschedule_keys
+                    else "scheduled" if pdc is not None
+                    else "unknown"
+                )
             })
 
         # Step 5: If no matches found, return empty result with info
         if not result:
-            print(f"No matching records found for part_number={part_number}, production_order={production_order}")
+            logger.debug("No matching records found for part_number=%s, production_order=%s",
+                         part_number, production_order)
 
         end_time = time.time()
-        print(f"Filtered PDC endpoint completed in {end_time - start_time:.2f} seconds. Result count: {len(result)}")
+        logger.info("Filtered PDC endpoint completed in %.2f seconds. Result count: %d",
+                    end_time - start_time, len(result))
 
-        return result
+        return ORJSONResponse(result)
 
     except Exception as e:
-        print(f"Error retrieving filtered production data: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error retrieving filtered production data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error filtering production data: {str(e)}"
         )
 
 """NEW PDC CODE"""
-@router.get("/part-production-pdc11", response_model=List[Dict[str, Any]])
+@router.get("/part-production-pdc11", response_class=ORJSONResponse, response_model=None)
 async def get_part_production_pdc2(part_number: str, production_order: str):
     """
-    Get the Probable Date of Completion (PDC) for each part number and production order.
+    Get the Probable Date of Completion (PDC) for a specific part number and production order.
 
-    Optimized for performance with caching, parallel processing, and proper async handling.
+    Same rows as /part-production-pdc, restricted to the requested part.
     """
     start_time = time.time()
 
     try:
         # Step 1: Get combined data (with caching)
-        combined_data = await get_combined_schedule_cached()
+        combined_data = await get_combined_schedule_cached(part_number, production_order)
 
         if not combined_data:
             return []
 
-        # Step 2: Process all data in parallel
-        active_parts, completed_parts, part_production_end_times, data_sources = await process_all_data(combined_data)
-
-        # Step 3: Build result efficiently
-        result = []
-        processed_parts = set()
-
-        # Add parts with PDC data
-        for (part_number, production_order), pdc in part_production_end_times.items():
-            result.append({
-                "part_number": part_number,
-                "production_order": production_order,
-                "pdc": pdc.isoformat() if isinstance(pdc, datetime) else str(pdc),
-                "status": "completed" if (part_number, production_order) in completed_parts else "in_progress",
-                "data_source": data_sources.get((part_number, production_order), "unknown")
-            })
-            processed_parts.add((part_number, production_order))
-
-        # Add active parts without PDC data
-        missing_active_parts = active_parts - processed_parts
-        for part_number, production_order in missing_active_parts:
-            result.append({
-                "part_number": part_number,
-                "production_order": production_order,
-                "pdc": None,
-                "status": "pending",
-                "data_source": "none"
-            })
-
-        # Sort result
-        result.sort(key=lambda x: (x["part_number"], x["production_order"]))
-
-        result1 = []
-
-        for i in result:
-            if i["part_number"] == part_number and i["production_order"] == production_order:
-                result1.append(i)
-
+        # Step 2: Build the row for the requested part off the event loop
+        rows = await run_in_threadpool(_build_pdc_rows, combined_data, (part_number, production_order))
+        result = [_pdc_row_to_dict(row) for row in rows]
 
         end_time = time.time()
-        print(f"PDC endpoint completed in {end_time - start_time:.2f} seconds")
+        logger.info("PDC endpoint completed in %.2f seconds", end_time - start_time)
 
-        return result1
+        return ORJSONResponse(result)
 
     except Exception as e:
-        print(f"Error retrieving PDC data: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error retrieving PDC data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error calculating PDC: {str(e)}"
@@ -583,13 +581,26 @@ async def get_part_production_pdc2(part_number: str, production_order: str):
 @router.post("/clear-cache")
 async def clear_pdc_cache():
     """Clear the PDC cache for testing/debugging"""
-    global _cache, _cache_timeout
+    global _completion_cache, _completion_snapshot
     _cache.clear()
-    _cache_timeout.clear()
+    _order_status_cache.clear()
+    _completion_cache = None
+    _completion_snapshot = None
     return {"message": "Cache cleared successfully"}
 
-from pydantic import BaseModel
-from typing import Optional
+
+ORDER_COMPLETED_MESSAGE = "ORDER COMPLETED - All eligible operations finished"
+ORDER_IN_PROGRESS_MESSAGE = "ORDER IN PROGRESS - {}/{} eligible operations completed".format
+FULLY_COMPLETED = "Fully Completed"
+IN_PROGRESS = "In Progress"
+
+# Fields shared by every row of the all-orders response, which only lists completed orders
+_COMPLETED_ORDER_FIELDS = {
+    "is_order_completed": True,
+    "message": ORDER_COMPLETED_MESSAGE,
+    "completion_percentage": 100.0,
+    "completion_date_status": FULLY_COMPLETED
+}
 
 
 class OrderCompletionRequest(BaseModel):
@@ -616,227 +627,103 @@ class OrderCompletionResponse(BaseModel):
 
 
 
-@router.post("/check-order-completion-simple/{part_number}/{production_order}")
-@db_session
-def check_order_completion_status_simple(part_number: str, production_order: str):
+def operation_log_totals(order=None) -> Dict[int, Tuple[int, bool, Optional[datetime]]]:
     """
-    Simplified version - Check if all operations for a production order are completed.
-    Returns basic completion status with overall completion date.
+    Per-operation completion and latest log end time in one grouped LEFT JOIN,
+    selecting only the columns the completion checks use.
+    The order's required quantity comes back with each row, so completion is decided once here.
+    Restricted to one order's operations when an order is given; operations without logs are kept.
+    Across all orders the rows come back ordered by order id, so each order's operations are contiguous.
+    Returns {operation_id: (order_id, is_complete, last_end_time)}.
     """
-    # Get the order
-    order = Order.get(production_order=production_order)
-    if not order:
-        raise HTTPException(status_code=404, detail="Production order not found")
-
-    # Validate part number matches
-    if order.part_number != part_number:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Part number mismatch. Expected: {order.part_number}, Provided: {part_number}"
+    if order is None:
+        query = left_join(
+            (op.id, op.order.id, op.order.required_quantity, sum(log.quantity_completed), max(log.end_time))
+            for op in Operation for log in op.production_logs
+        ).order_by(2)
+    else:
+        query = left_join(
+            (op.id, op.order.id, op.order.required_quantity, sum(log.quantity_completed), max(log.end_time))
+            for op in Operation for log in op.production_logs if op.order == order
         )
 
-    # Get all operations for this order
-    operations = select(op for op in Operation if op.order == order)
+    return {
+        op_id: (order_id, (completed_qty or 0) >= required_quantity, last_end_time)
+        for op_id, order_id, required_quantity, completed_qty, last_end_time in query
+    }
 
-    if not operations:
-        raise HTTPException(status_code=404, detail="No operations found for this production order")
 
-    # Check if all eligible operations are completed
+def _compute_order_status(operation_ids, log_totals, validations,
+                          stop_at_incomplete: bool = False) -> Tuple[bool, int, int, Optional[datetime]]:
+    """
+    Classify one order's operations by sequence eligibility and completion.
+    Only operations that can be logged now or are already complete count as eligible.
+    With stop_at_incomplete the walk ends at the first eligible operation that is not complete.
+    Returns (all_eligible_operations_completed, completed_count, total_eligible, overall_completion_date);
+    the completion date is the latest log end time and only set once every eligible operation is complete.
+    """
     all_eligible_operations_completed = True
     completed_count = 0
-    eligible_operations = []
-    all_completion_end_times = []
-
-    for op in operations:
-        logs = select(log for log in ProductionLog if log.operation == op)
-        operation_completed_qty = sum(log.quantity_completed or 0 for log in logs)
-        is_operation_complete = operation_completed_qty >= order.required_quantity
-
-        # Check if this operation can be logged (sequence validation)
-        can_log, validation_reason = validate_operation_sequence(op.id)
-
-        # Override can_log if operation is already completed
-        if is_operation_complete:
-            can_log = False
-            validation_reason = "Operation is already completed"
+    total_eligible = 0
+    overall_completion_date = None
 
-        # Only consider operations that are either:
-        # 1. Currently eligible for logging (can_log = True), OR
-        # 2. Already completed (meaning they were previously eligible and now finished)
-        is_eligible_operation = can_log or is_operation_complete
+    for op_id in operation_ids:
+        _, is_operation_complete, last_end_time = log_totals[op_id]
 
-        if is_eligible_operation:
-            eligible_operations.append(op)
+        # A completed operation can no longer be logged but stays eligible
+        if is_operation_complete or validations[op_id][0]:
+            total_eligible += 1
             if is_operation_complete:
                 completed_count += 1
-
-                # Collect all end_times from logs for this completed operation
-                for log in logs:
-                    if log.end_time:
-                        all_completion_end_times.append(log.end_time)
+                if last_end_time and (overall_completion_date is None or last_end_time > overall_completion_date):
+                    overall_completion_date = last_end_time
             else:
                 all_eligible_operations_completed = False
+                if stop_at_incomplete:
+                    break
 
-    if not eligible_operations:
-        raise HTTPException(
-            status_code=400,
-            detail="No operations are currently eligible for logging based on sequence validation"
-        )
-
-    total_eligible = len(eligible_operations)
-
-    # Calculate overall completion date
-    overall_completion_date = None
-    if all_eligible_operations_completed and all_completion_end_times:
-        # Only set completion date if ALL eligible operations are completed
-        overall_completion_date = max(all_completion_end_times)
+    if not all_eligible_operations_completed:
+        overall_completion_date = None
 
-    return {
-        "is_order_completed": all_eligible_operations_completed,
-        "message": "ORDER COMPLETED - All eligible operations finished" if all_eligible_operations_completed else f"ORDER IN PROGRESS - {completed_count}/{total_eligible} eligible operations completed",
-        "part_number": order.part_number,
-        "production_order": order.production_order,
-        "project_name": order.project.name,
-        "completed_operations": completed_count,
-        "total_eligible_operations": total_eligible,
-        "total_all_operations": len(operations),
-        "completion_percentage": round((completed_count / total_eligible) * 100, 2) if total_eligible > 0 else 0,
-        "overall_completion_date": overall_completion_date,
-        "completion_date_status": "Fully Completed" if all_eligible_operations_completed and overall_completion_date else "In Progress"
-    }
+    return all_eligible_operations_completed, completed_count, total_eligible, overall_completion_date
 
 
-from fastapi import HTTPException
-from pony.orm import db_session, select
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, List, Dict, Any
+# Single-order completion responses: order id -> (latest log id, expiry, response)
+_order_status_cache: Dict[int, Tuple[int, float, Dict[str, Any]]] = {}
+ORDER_STATUS_CACHE_TTL = 5
 
-# Thread pool executor for database operations
-executor = ThreadPoolExecutor(max_workers=10)
+# Per-operation results of the last all-orders scan, reused by single-order checks on the same terms
+# as _order_status_cache: (expiry, latest log id by order id, log_totals, validations, operation ids by order id)
+_completion_snapshot: Optional[Tuple[float, Dict[int, int], Dict[int, Tuple[int, bool, Optional[datetime]]],
+                                     Dict[int, Tuple[bool, str]], Dict[int, List[int]]]] = None
 
 
-@router.get("/check-order-completion-simple/{part_number}/{production_order}")
-async def check_order_completion_status_simple(part_number: str, production_order: str):
+def _fresh_completion_snapshot(order_id: int, latest_log_id: int):
     """
-    Simplified version - Check if all operations for a production order are completed.
-    Returns basic completion status with overall completion date.
-    Optimized with async/await for faster performance.
+    Last all-orders snapshot if it is younger than the single-order cache TTL, covers the order
+    and saw the same latest log for it.
     """
+    snapshot = _completion_snapshot
+    if snapshot is None or snapshot[0] <= time.time():
+        return None
+    if order_id not in snapshot[4] or snapshot[1].get(order_id, 0) != latest_log_id:
+        return None
+    return snapshot
 
-    def execute_db_operations():
-        """Execute all database operations in a single session"""
-        with db_session:
-            # Get the order
-            order = Order.get(production_order=production_order)
-            if not order:
-                raise HTTPException(status_code=404, detail="Production order not found")
-
-            # Validate part number matches
-            if order.part_number != part_number:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Part number mismatch. Expected: {order.part_number}, Provided: {part_number}"
-                )
-
-            # Get all operations for this order
-            operations = select(op for op in Operation if op.order == order)
-            operations_list = list(operations)
-
-            if not operations_list:
-                raise HTTPException(status_code=404, detail="No operations found for this production order")
-
-            # Process all operations
-            all_eligible_operations_completed = True
-            completed_count = 0
-            eligible_operations = []
-            all_completion_end_times = []
-
-            for op in operations_list:
-                logs = select(log for log in ProductionLog if log.operation == op)
-                logs_list = list(logs)
-
-                operation_completed_qty = sum(log.quantity_completed or 0 for log in logs_list)
-                is_operation_complete = operation_completed_qty >= order.required_quantity
-
-                # Check if this operation can be logged (sequence validation)
-                can_log, validation_reason = validate_operation_sequence(op.id)
-
-                # Override can_log if operation is already completed
-                if is_operation_complete:
-                    can_log = False
-                    validation_reason = "Operation is already completed"
-
-                # Only consider operations that are either:
-                # 1. Currently eligible for logging (can_log = True), OR
-                # 2. Already completed (meaning they were previously eligible and now finished)
-                is_eligible_operation = can_log or is_operation_complete
-
-                if is_eligible_operation:
-                    eligible_operations.append(op)
-                    if is_operation_complete:
-                        completed_count += 1
-
-                        # Collect all end_times from logs for this completed operation
-                        for log in logs_list:
-                            if log.end_time:
-                                all_completion_end_times.append(log.end_time)
-                    else:
-                        all_eligible_operations_completed = False
-
-            if not eligible_operations:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No operations are currently eligible for logging based on sequence validation"
-                )
 
-            total_eligible = len(eligible_operations)
-
-            # Calculate overall completion date
-            overall_completion_date = None
-            if all_eligible_operations_completed and all_completion_end_times:
-                # Only set completion date if ALL eligible operations are completed
-                overall_completion_date = max(all_completion_end_times)
-
-            return {
-                "is_order_completed": all_eligible_operations_completed,
-                "message": "ORDER COMPLETED - All eligible operations finished" if all_eligible_operations_completed else f"ORDER IN PROGRESS - {completed_count}/{total_eligible} eligible operations completed",
-                "part_number": order.part_number,
-                "production_order": order.production_order,
-                "project_name": order.project.name,
-                "completed_operations": completed_count,
-                "total_eligible_operations": total_eligible,
-                "total_all_operations": len(operations_list),
-                "completion_percentage": round((completed_count / total_eligible) * 100,
-                                               2) if total_eligible > 0 else 0,
-                "overall_completion_date": overall_completion_date,
-                "completion_date_status": "Fully Completed" if all_eligible_operations_completed and overall_completion_date else "In Progress"
-            }
-
-    # Execute database operations asynchronously
-    loop = asyncio.get_event_loop()
-    try:
-        result = await loop.run_in_executor(executor, execute_db_operations)
-        return result
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
-        # Handle any other exceptions
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-
-# Alternative version without async if the above still causes issues
-@router.get("/check-order-completion-simple-sync/{part_number}/{production_order}")
+@router.get("/check-order-completion-simple/{part_number}/{production_order}", response_class=ORJSONResponse, response_model=None)
+@router.post("/check-order-completion-simple/{part_number}/{production_order}", response_class=ORJSONResponse, response_model=None)
+@router.get("/check-order-completion-simple-sync/{part_number}/{production_order}", response_class=ORJSONResponse, response_model=None)
 @db_session
-def check_order_completion_status_simple_sync(part_number: str, production_order: str):
+def check_order_completion_status_simple(part_number: str, production_order: str):
     """
     Simplified version - Check if all operations for a production order are completed.
     Returns basic completion status with overall completion date.
-    Synchronous version for stability.
+    Declared as a plain def so FastAPI runs the blocking Pony queries in its threadpool;
+    the former -sync route is served by the same handler.
     """
-    # Get the order
-    order = Order.get(production_order=production_order)
+    # Get the order, with its project for the response
+    order = Order.select(lambda o: o.production_order == production_order).prefetch(Order.project).first()
     if not order:
         raise HTTPException(status_code=404, detail="Production order not found")
 
@@ -847,86 +734,128 @@ def check_order_completion_status_simple_sync(part_number: str, production_order
             detail=f"Part number mismatch. Expected: {order.part_number}, Provided: {part_number}"
         )
 
-    # Get all operations for this order
-    operations = select(op for op in Operation if op.order == order)
+    # New logs for the order invalidate its cached status; the TTL covers edits to existing ones
+    latest_log_id = select(max(log.id) for log in ProductionLog if log.operation.order == order).first() or 0
+    cached = _order_status_cache.get(order.id)
+    if cached and cached[0] == latest_log_id and cached[1] > time.time():
+        return ORJSONResponse(cached[2])
+
+    # Get all operations for this order and their logged totals, from the all-orders snapshot when it is current
+    snapshot = _fresh_completion_snapshot(order.id, latest_log_id)
+    if snapshot:
+        _, _, log_totals, validations, ops_by_order = snapshot
+        operation_ids = ops_by_order[order.id]
+    else:
+        log_totals = operation_log_totals(order)
+        operation_ids = list(log_totals)
 
-    if not operations:
+    if not operation_ids:
         raise HTTPException(status_code=404, detail="No operations found for this production order")
 
-    # Check if all eligible operations are completed
-    all_eligible_operations_completed = True
-    completed_count = 0
-    eligible_operations = []
-    all_completion_end_times = []
-
-    for op in operations:
-        logs = select(log for log in ProductionLog if log.operation == op)
-        operation_completed_qty = sum(log.quantity_completed or 0 for log in logs)
-        is_operation_complete = operation_completed_qty >= order.required_quantity
+    if not snapshot:
+        validations = validate_operation_sequence_bulk(operation_ids)
+    all_eligible_operations_completed, completed_count, total_eligible, overall_completion_date = _compute_order_status(
+        operation_ids, log_totals, validations
+    )
 
-        # Check if this operation can be logged (sequence validation)
-        can_log, validation_reason = validate_operation_sequence(op.id)
-
-        # Override can_log if operation is already completed
-        if is_operation_complete:
-            can_log = False
-            validation_reason = "Operation is already completed"
-
-        # Only consider operations that are either:
-        # 1. Currently eligible for logging (can_log = True), OR
-        # 2. Already completed (meaning they were previously eligible and now finished)
-        is_eligible_operation = can_log or is_operation_complete
-
-        if is_eligible_operation:
-            eligible_operations.append(op)
-            if is_operation_complete:
-                completed_count += 1
-
-                # Collect all end_times from logs for this completed operation
-                for log in logs:
-                    if log.end_time:
-                        all_completion_end_times.append(log.end_time)
-            else:
-                all_eligible_operations_completed = False
-
-    if not eligible_operations:
+    if not total_eligible:
         raise HTTPException(
             status_code=400,
             detail="No operations are currently eligible for logging based on sequence validation"
         )
 
-    total_eligible = len(eligible_operations)
-
-    # Calculate overall completion date
-    overall_completion_date = None
-    if all_eligible_operations_completed and all_completion_end_times:
-        # Only set completion date if ALL eligible operations are completed
-        overall_completion_date = max(all_completion_end_times)
-
-    return {
+    result = {
         "is_order_completed": all_eligible_operations_completed,
-        "message": "ORDER COMPLETED - All eligible operations finished" if all_eligible_operations_completed else f"ORDER IN PROGRESS - {completed_count}/{total_eligible} eligible operations completed",
+        "message": ORDER_COMPLETED_MESSAGE if all_eligible_operations_completed else ORDER_IN_PROGRESS_MESSAGE(completed_count, total_eligible),
         "part_number": order.part_number,
         "production_order": order.production_order,
         "project_name": order.project.name,
         "completed_operations": completed_count,
         "total_eligible_operations": total_eligible,
-        "total_all_operations": len(operations),
+        "total_all_operations": len(operation_ids),
         "completion_percentage": round((completed_count / total_eligible) * 100, 2) if total_eligible > 0 else 0,
         "overall_completion_date": overall_completion_date,
-        "completion_date_status": "Fully Completed" if all_eligible_operations_completed and overall_completion_date else "In Progress"
+        "completion_date_status": FULLY_COMPLETED if all_eligible_operations_completed and overall_completion_date else IN_PROGRESS
     }
+    _order_status_cache[order.id] = (latest_log_id, time.time() + ORDER_STATUS_CACHE_TTL, result)
+    return ORJSONResponse(result)
+
+
+# Cached all-orders completion payload: (etag, expiry, payload)
+_completion_cache: Optional[Tuple[str, float, Dict[str, Any]]] = None
+COMPLETION_CACHE_TTL = 30  # Log edits do not change the fingerprint, so the entry still expires
+# Lets concurrent pollers wait on the event loop for one recomputation instead of each taking a thread
+_completion_lock = asyncio.Lock()
+
+
+def _fresh_completion_payload(etag: str) -> Optional[Dict[str, Any]]:
+    """Cached payload if it still matches the fingerprint and has not expired"""
+    cached = _completion_cache
+    if cached and cached[0] == etag and cached[1] > time.time():
+        return cached[2]
+    return None
 
 
-@router.get("/check-order-completion-simple")
 @db_session
-def get_all_orders_completion_status():
+def completion_fingerprint() -> str:
+    """Cheap ETag for the completion data: newest production log id and number of orders"""
+    latest_log_id = select(max(log.id) for log in ProductionLog).first()
+    order_count = count(order for order in Order)
+    return f'"{latest_log_id or 0}-{order_count}"'
+
+
+@router.get("/check-order-completion-simple", response_class=ORJSONResponse, response_model=None)
+async def get_all_orders_completion_status(if_none_match: Optional[str] = Header(None)):
     """
     Get completion status for all production orders.
     Returns list of all orders with their completion status.
+    Results are cached briefly and tagged with an ETag so polling clients can get a 304;
+    the completed orders are streamed in chunks rather than serialized in one piece.
+    Only the Pony queries run in the threadpool, and only one request recomputes at a time.
     """
-    # Get all orders
-    all_orders = select(order for order in Order)
+    global _completion_cache
+
+    etag = await run_in_threadpool(completion_fingerprint)
+    payload = _fresh_completion_payload(etag)
+    if payload is not None and if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if payload is None:
+        async with _completion_lock:
+            # Another request may have refreshed the cache while this one waited
+            payload = _fresh_completion_payload(etag)
+            if payload is None:
+                payload = await run_in_threadpool(all_orders_completion_payload)
+                _completion_cache = (etag, time.time() + COMPLETION_CACHE_TTL, payload)
+
+    return StreamingResponse(_stream_completion_json(payload), media_type="application/json", headers={"ETag": etag})
+
+
+async def _stream_completion_json(payload: Dict[str, Any]):
+    """Yield the payload as JSON, serializing the completed_orders list a chunk at a time"""
+    orders = payload.get("completed_orders")
+    if not orders:
+        yield orjson.dumps(payload)
+        return
+
+    # Every other key is small; emit them first, then open the orders array
+    head = orjson.dumps({key: value for key, value in payload.items() if key != "completed_orders"})
+    yield head[:-1] + b',"completed_orders":['
+    for start in range(0, len(orders), PDC_STREAM_CHUNK_SIZE):
+        chunk = b",".join(orjson.dumps(order) for order in orders[start:start + PDC_STREAM_CHUNK_SIZE])
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+
+@db_session
+def all_orders_completion_payload() -> Dict[str, Any]:
+    """Compute the completed-orders response and keep the per-operation results as a snapshot"""
+    global _completion_snapshot
+
+    # Only the response columns are selected, so no entities pile up in the session's identity map
+    all_orders = select(
+        (order.id, order.part_number, order.production_order, order.project.name) for order in Order
+    )[:]
 
     if not all_orders:
         return {
@@ -934,79 +863,53 @@ def get_all_orders_completion_status():
             "orders": []
         }
 
+    # Single-order checks key their cache on the order's latest log id, so the snapshot records it per order;
+    # read before the totals so a log written in between makes the snapshot look older, not newer
+    latest_log_ids = dict(select((log.operation.order.id, max(log.id)) for log in ProductionLog))
+
+    # Every order is considered, so load all operations and log totals once and group them in memory
+    log_totals = operation_log_totals()
+    ops_by_order = {
+        order_id: [op_id for op_id, _ in order_ops]
+        for order_id, order_ops in groupby(log_totals.items(), key=lambda item: item[1][0])
+    }
+
+    validations = validate_operation_sequence_bulk(None)
+    _completion_snapshot = (time.time() + ORDER_STATUS_CACHE_TTL, latest_log_ids, log_totals, validations, ops_by_order)
+
     completed_orders_status = []
 
-    for order in all_orders:
+    for order_id, part_number, production_order, project_name in all_orders:
         # Get all operations for this order
-        operations = select(op for op in Operation if op.order == order)
+        operations = ops_by_order.get(order_id, [])
 
         if not operations:
             # Skip orders with no operations since they can't be completed
             continue
 
-        # Check if all eligible operations are completed
-        all_eligible_operations_completed = True
-        completed_count = 0
-        eligible_operations = []
-        all_completion_end_times = []
-
-        for op in operations:
-            logs = select(log for log in ProductionLog if log.operation == op)
-            operation_completed_qty = sum(log.quantity_completed or 0 for log in logs)
-            is_operation_complete = operation_completed_qty >= order.required_quantity
+        # Only completed orders are reported, so stop at the first incomplete eligible operation
+        all_eligible_operations_completed, completed_count, total_eligible, overall_completion_date = _compute_order_status(
+            operations, log_totals, validations, stop_at_incomplete=True
+        )
 
-            # Check if this operation can be logged (sequence validation)
-            can_log, validation_reason = validate_operation_sequence(op.id)
+        if not all_eligible_operations_completed:
+            continue
 
-            # Override can_log if operation is already completed
-            if is_operation_complete:
-                can_log = False
-                validation_reason = "Operation is already completed"
-
-            # Only consider operations that are either:
-            # 1. Currently eligible for logging (can_log = True), OR
-            # 2. Already completed (meaning they were previously eligible and now finished)
-            is_eligible_operation = can_log or is_operation_complete
-
-            if is_eligible_operation:
-                eligible_operations.append(op)
-                if is_operation_complete:
-                    completed_count += 1
-
-                    # Collect all end_times from logs for this completed operation
-                    for log in logs:
-                        if log.end_time:
-                            all_completion_end_times.append(log.end_time)
-                else:
-                    all_eligible_operations_completed = False
-
-        if not eligible_operations:
+        if not total_eligible:
             # Skip orders with no eligible operations since they can't be completed
             continue
 
-        total_eligible = len(eligible_operations)
-
-        # Calculate overall completion date
-        overall_completion_date = None
-        if all_eligible_operations_completed and all_completion_end_times:
-            # Only set completion date if ALL eligible operations are completed
-            overall_completion_date = max(all_completion_end_times)
-
-        # Only add to results if order is completed
-        if all_eligible_operations_completed:
-            completed_orders_status.append({
-                "part_number": order.part_number,
-                "production_order": order.production_order,
-                "project_name": order.project.name if order.project else "Unknown",
-                "is_order_completed": True,
-                "message": "ORDER COMPLETED - All eligible operations finished",
-                "completed_operations": completed_count,
-                "total_eligible_operations": total_eligible,
-                "total_all_operations": len(operations),
-                "completion_percentage": 100.0,
-                "overall_completion_date": overall_completion_date,
-                "completion_date_status": "Fully Completed"
-            })
+        # Only completed orders reach this point
+        completed_orders_status.append({
+            "part_number": part_number,
+            "production_order": production_order,
+            "project_name": project_name or "Unknown",
+            "completed_operations": completed_count,
+            "total_eligible_operations": total_eligible,
+            "total_all_operations": len(operations),
+            "overall_completion_date": overall_completion_date,
+            **_COMPLETED_ORDER_FIELDS
+        })
 
     # Check if any completed orders found
     if not completed_orders_status:
@@ -1,12 +1,22 @@
 from fastapi import FastAPI, File, UploadFile, APIRouter, HTTPException, Query
-from pony.orm import db_session, select, commit, count, get
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pony.orm import db_session, select, commit, count, get, flush
 from datetime import datetime, timedelta
 from typing import List, Optional
-import PyPDF2
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict
+from decimal import Decimal
+import pypdf
+import asyncio
 import io
+import logging
+import multiprocessing
+import orjson
+import os
 import re
-import json
 from app.database.connection import db
+from app.models.raw_sql import sql_table, sql_column, sql_columns
 from app.models import (
     WorkCenter, Machine, Project, Order, Operation,
     ProcessPlan, Document, ToolList, JigsAndFixturesList,
@@ -16,14 +26,78 @@ from app.schemas.planning import CreateOperationRequest, CreateOrderRequest, Ord
     SaveDataRequest, ProjectPriorityUpdateRequest, OrderUpdate_Response, OrderUpdate_Request, CreateOrderRequest_new
 
 router = APIRouter(prefix="/api/v1/planning", tags=["planning"])
+logger = logging.getLogger(__name__)
+
+# OARC patterns, compiled once at import instead of on every upload
+_PROJECT_RE = re.compile(r"Project Name\s*:([^:]+)Part No\s*:([^W]+)WBS\s*:\s*([^\n]+)")
+_SALE_RE = re.compile(r"Sale order\s*:([^:]+)Part Desc\s*:([^T]+)")
+_PLANT_RE = re.compile(r"Plant\s*:([^R]+)Rtg\s+Seq\s*No\s*:([^S]+)Sequence\s*No\s*:([^\n]+)")
+_QTY_RE = re.compile(
+    r"Required\s*Qty\s*:\s*([^\n]+?)\s*"
+    r"Launched\s*Qty\s*:\s*([^\n]+?)\s*"
+    r"Prod\s*Order\s*No\s*:\s*([^\n]+)"
+)
+# Decimals are written as \d+(?:\.\d*)? rather than \d+\.?\d* so a digit run has only one way to split,
+# which keeps malformed rows from backtracking through every split point
+_OP_ROW_RE = re.compile(
+    r'(\d{4})\s+([A-Z0-9-]+)\s+(\d+(?:\.\d*)?)\s+(\d+(?:\.\d*)?)\s+(\d+)\s+(\d+)\s+(\d+(?:\.\d*)?)\s*(\d*)', re.ASCII
+)
+# All four headers in one pass; each alternative sits in a lookahead so a header whose value runs
+# on (e.g. Part Desc up to the next "T") cannot consume the start of the header after it
+_HEADER_RE = re.compile(
+    "(?=(?P<project>{})|(?P<sale>{})|(?P<plant>{})|(?P<qty>{}))".format(
+        _PROJECT_RE.pattern, _SALE_RE.pattern, _PLANT_RE.pattern, _QTY_RE.pattern
+    )
+)
+_PLANT_NUM_RE = re.compile(r'^(\d+)\s*(.*)')
+# The description is bounded by the numeric tail anchored at the end of the line instead of
+# a [\w\s] class that overlaps the surrounding \s+, which could backtrack badly on malformed lines
+_RAW_MAT_RE = re.compile(r'(\d{4})\s+(\S+)\s+(.+?)\s+(\d+(?:\.\d+)?)\s+(\S+)\s+(\d+(?:\.\d+)?)\s*$')
+
+
+def _page_text(page):
+    """Extract a page's text, skipping pages with no fonts and only image XObjects (scans, stamps)."""
+    if "/Resources" in page:
+        resources = page["/Resources"]
+        xobjects = resources["/XObject"] if "/XObject" in resources else {}
+        if "/Font" not in resources and all(xobjects[name]["/Subtype"] == "/Image" for name in xobjects):
+            return ""
+    return page.extract_text()
+
+
+def _lines_with_lookahead(text):
+    """Yield each line of text with the two lines after it ("" past the end), without building a list of lines."""
+    lines = io.StringIO(text)
+    line, next_line, next_next_line = next(lines, None), next(lines, None), next(lines, None)
+    while line is not None:
+        yield line, next_line or "", next_next_line or ""
+        line, next_line, next_next_line = next_line, next_next_line, next(lines, None)
+
+
+_pdf_pool = None
+
+
+def _pdf_parse_pool():
+    """Process pool for OARC parsing, started on first upload; spawned so workers do not fork the server's threads."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+    return _pdf_pool
+
+
+def shutdown_pdf_parse_pool():
+    """Stop the OARC parsing workers, if any were started, without waiting for queued parses."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
 
 
 def extract_oarc_details(pdf_content):
     # Read PDF
-    pdf_reader = PyPDF2.PdfReader(pdf_content)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
+    pdf_reader = pypdf.PdfReader(pdf_content)
+    # Join once instead of growing the string page by page
+    text = "".join(_page_text(page) + "\n" for page in pdf_reader.pages)
 
     # Initialize dictionary to store extracted data
     data = {
@@ -44,21 +118,31 @@ def extract_oarc_details(pdf_content):
     }
 
     # Extract header information using specific patterns
+    # Find where each header first starts in one scan, then match it there for its groups
+    header_starts = {}
+    for header_match in _HEADER_RE.finditer(text):
+        header_starts.setdefault(header_match.lastgroup, header_match.start())
+        if len(header_starts) == 4:
+            break
+
+    def header(name, pattern):
+        return pattern.match(text, header_starts[name]) if name in header_starts else None
+
     # Project Name and Part No
-    project_match = re.search(r"Project Name\s*:([^:]+)Part No\s*:([^W]+)WBS\s*:\s*([^\n]+)", text)
+    project_match = header("project", _PROJECT_RE)
     if project_match:
         data["Project Name"] = project_match.group(1).strip()
         data["Part No"] = project_match.group(2).strip()
         data["WBS"] = project_match.group(3).strip()
 
     # Sale order and Part Desc
-    sale_match = re.search(r"Sale order\s*:([^:]+)Part Desc\s*:([^T]+)", text)
+    sale_match = header("sale", _SALE_RE)
     if sale_match:
         data["Sale Order"] = sale_match.group(1).strip()
         data["Part Desc"] = sale_match.group(2).strip()
 
     # Plant and sequence numbers
-    plant_match = re.search(r"Plant\s*:([^R]+)Rtg\s+Seq\s*No\s*:([^S]+)Sequence\s*No\s*:([^\n]+)", text)
+    plant_match = header("plant", _PLANT_RE)
     if plant_match.group(1):
         data["Plant"] = plant_match.group(1).strip()
         data["Rtg Seq No"] = plant_match.group(2).strip()
@@ -69,12 +153,7 @@ def extract_oarc_details(pdf_content):
         data["Sequence No"] = plant_match.group(6).strip()
 
     # Required Qty, Launched Qty, and Prod Order No
-    qty_match = re.search(
-        r"Required\s*Qty\s*:\s*([^\n]+?)\s*"
-        r"Launched\s*Qty\s*:\s*([^\n]+?)\s*"
-        r"Prod\s*Order\s*No\s*:\s*([^\n]+)",
-        text
-    )
+    qty_match = header("qty", _QTY_RE)
 
     if qty_match:
         if qty_match.group(1):
@@ -86,34 +165,34 @@ def extract_oarc_details(pdf_content):
             data["Launched Qty"] = qty_match.group(5).strip()
             data["Prod Order No"] = qty_match.group(6).strip()
 
-    # Extract operations
-    lines = text.split('\n')
+    # Extract operations and raw materials in a single pass over the lines;
+    # the two sections are tracked independently, as the operations section runs to the end
     operation_started = False
     current_operation = None
     long_text_started = False
+    raw_materials_started = False
 
-    for i, line in enumerate(lines):
+    for line, next_line, next_next_line in _lines_with_lookahead(text):
         line = line.strip()
-        if not line or line.startswith('_'):
+        # Indexing the first character avoids a method lookup per line
+        if not line or line[0] == '_':
             continue
 
         # Check if we've reached the operations section
         if "Oprn" in line and "Operation" in line:
             operation_started = True
-            continue
 
-        if operation_started:
+        elif operation_started:
             # Try to match operation row
-            op_match = re.match(
-                r'(\d{4})\s+([A-Z0-9-]+)\s+(\d+\.?\d*)\s+(\d+\.?\d*)\s+(\d+)\s+(\d+)\s+(\d+\.?\d*)\s*(\d*)', line)
+            op_match = _OP_ROW_RE.match(line)
 
             if op_match:
                 if current_operation:
                     data["Operations"].append(current_operation)
 
                 # Get the next line for additional plant info and operation
-                next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-                next_next_line = lines[i + 2].strip() if i + 2 < len(lines) else ""
+                next_line = next_line.strip()
+                next_next_line = next_next_line.strip()
 
                 # Extract plant number and operation description
                 plant_number = ""
@@ -121,7 +200,7 @@ def extract_oarc_details(pdf_content):
 
                 if next_line:
                     # Check if next line contains a plant number
-                    plant_match = re.match(r'^(\d+)\s*(.*)', next_line)
+                    plant_match = _PLANT_NUM_RE.match(next_line)
                     if plant_match:
                         plant_number = plant_match.group(1)
                         if plant_match.group(2):  # If there's text after the number
@@ -147,32 +226,19 @@ def extract_oarc_details(pdf_content):
             elif current_operation:
                 if "Long Text:" in line:
                     long_text_started = True
-                    continue
-
-                if long_text_started:
+                elif long_text_started:
                     if current_operation["Long Text"]:
                         current_operation["Long Text"] += "\n" + line
                     else:
                         current_operation["Long Text"] = line
 
-    # Add the last operation if exists
-    if current_operation:
-        data["Operations"].append(current_operation)
-
-    raw_materials_started = False
-    raw_material_pattern = r'(\d{4})\s+(\w+)\s+([\w\s\-\.]+)\s+([\d\.]+)\s+(\w+)\s+([\d\.]+)'
-
-    for i, line in enumerate(lines):
-        line = line.strip()
-
         # Check if we've reached the raw materials section
-        if "Item" in line and ("Child Part No" in line or "Child" in line):
+        if "Item" in line and "Child" in line:
             raw_materials_started = True
-            continue
 
-        if raw_materials_started and not line.startswith('_'):
+        elif raw_materials_started:
             # Try to match raw material row
-            raw_match = re.match(raw_material_pattern, line)
+            raw_match = _RAW_MAT_RE.match(line)
             if raw_match:
                 raw_material = {
                     "Sl.No": raw_match.group(1),
@@ -184,21 +250,91 @@ def extract_oarc_details(pdf_content):
                 }
                 data["Raw Materials"].append(raw_material)
 
-        # End raw materials section if we hit another section
-        if raw_materials_started and line.startswith('SPECIAL NOTE'):
-            raw_materials_started = False
+            # End raw materials section if we hit another section
+            if line[:12] == 'SPECIAL NOTE':
+                raw_materials_started = False
+
+    # Add the last operation if exists
+    if current_operation:
+        data["Operations"].append(current_operation)
 
-    print(f"\n\n{'$' * 50}\n{data}\n{'$' * 50}\n\n")
+    logger.debug("Parsed OARC: %s", data)
 
     return data
 
 
+# Ids of lookup rows (inventory statuses, units, machine statuses) keyed by (entity name, row name)
+_lookup_ids = {}
+
+
+def _lookup_id(entity, name, **defaults):
+    """Return the id of the lookup row with this name, creating it if missing.
+
+    Ids of rows that already existed are cached for the life of the process; a row created here
+    is only cached once a later call finds it committed, so a rolled-back upload leaves no stale id.
+    """
+    key = (entity.__name__, name)
+    lookup_id = _lookup_ids.get(key)
+    if lookup_id is None:
+        # select().first() rather than get(): some lookup tables hold duplicate names
+        row = entity.select(lambda r: r.name == name).first()
+        if row:
+            lookup_id = _lookup_ids[key] = row.id
+        else:
+            row = entity(name=name, **defaults)
+            flush()
+            lookup_id = row.id
+    return lookup_id
+
+
+def _insert_operations(order_id, rows):
+    """Insert an order's operations in one multi-row INSERT on the session connection.
+
+    Each row is (work_center_id, machine_id, operation_number, operation_description, setup_time,
+    ideal_cycle_time). Pending Pony changes are flushed first so the INSERT sees the new order.
+    The rows bypass Pony's identity map and attribute validation, so callers pass ids they have
+    already resolved and do not read the order's operations back in the same session.
+    """
+    if not rows:
+        return
+    flush()
+    params = []
+    for row in rows:
+        params.extend((order_id, *row))
+    columns = sql_columns(
+        Operation.order, Operation.work_center, Operation.machine, Operation.operation_number,
+        Operation.operation_description, Operation.setup_time, Operation.ideal_cycle_time
+    )
+    cursor = db.get_connection().cursor()
+    cursor.execute(
+        f"INSERT INTO {sql_table(Operation)} ({columns}) VALUES "
+        + ",".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(rows)),
+        params
+    )
+
+
+def _source_operation_rows(source_order):
+    """Operations of an order as _insert_operations rows, read without loading work centers or machines."""
+    return select(
+        (op.work_center.id, op.machine.id, op.operation_number, op.operation_description,
+         op.setup_time, op.ideal_cycle_time)
+        for op in source_order.operations
+    )[:]
+
+
 @db_session
 def save_to_database(data):
     try:
-        # Check if order exists
-        existing_order = Order.get(production_order=data["Prod Order No"])
-        if existing_order:
+        # Check if the order and its scheduling status exist in one round-trip
+        prod_order_no, part_no = data["Prod Order No"], data["Part No"]
+        order_exists, part_status_exists = db.select(
+            f"SELECT EXISTS (SELECT 1 FROM {sql_table(Order)} "
+            f"WHERE {sql_column(Order.production_order)} = $prod_order_no), "
+            f"EXISTS (SELECT 1 FROM {sql_table(PartScheduleStatus)} "
+            f"WHERE {sql_column(PartScheduleStatus.part_number)} = $part_no "
+            f"AND {sql_column(PartScheduleStatus.production_order)} = $prod_order_no)"
+        )[0]
+        if order_exists:
             raise HTTPException(status_code=400, detail=f"Production order '{data['Prod Order No']}' already exists.")
 
         # Always create a new project instead of reusing existing ones
@@ -212,25 +348,16 @@ def save_to_database(data):
             delivery_date=datetime.now()
         )
 
-        # Get or create default inventory status
-        default_status = InventoryStatus.get(name="Available")
-        if not default_status:
-            default_status = InventoryStatus(
-                name="Available",
-                description="Material is available for use"
-            )
+        # Get or create default inventory status; Pony accepts the id in place of the entity
+        default_status = _lookup_id(InventoryStatus, "Available", description="Material is available for use")
 
         # Get or create default unit
-        default_unit = Unit.get(name="EA")
-        if not default_unit:
-            default_unit = Unit(name="EA")  # EA for "Each"
+        default_unit = _lookup_id(Unit, "EA")  # EA for "Each"
 
         # Create raw material - Modified part
         if "Raw Materials" in data and data["Raw Materials"] and len(data["Raw Materials"]) > 0:
             # Create raw material from provided data
-            unit = Unit.get(name=data["Raw Materials"][0]["UoM"])
-            if not unit:
-                unit = Unit(name=data["Raw Materials"][0]["UoM"])
+            unit = _lookup_id(Unit, data["Raw Materials"][0]["UoM"])
 
             raw_material = RawMaterial(
                 child_part_number=data["Raw Materials"][0]["Child Part No"],
@@ -267,8 +394,7 @@ def save_to_database(data):
         )
 
         # Create initial 'inactive' status for scheduling - FIX: Use both part_number and production_order
-        part_status = PartScheduleStatus.get(part_number=data["Part No"], production_order=data["Prod Order No"])
-        if not part_status:
+        if not part_status_exists:
             PartScheduleStatus(
                 part_number=data["Part No"],
                 production_order=data["Prod Order No"],
@@ -286,17 +412,23 @@ def save_to_database(data):
             )
 
         # Get or create default machine status
-        default_status_on = Status.get(name="ON")
-        if not default_status_on:
-            default_status_on = Status(
-                name="ON",
-                description="Machine is operational"
-            )
-
-        # Create operations and work centers
+        default_status_on = _lookup_id(Status, "ON", description="Machine is operational")
+
+        # Load the work centers, their first machine and that machine's status once for all operations
+        codes = list({op["Wc/Plant"] for op in data["Operations"]})
+        work_centers = {wc.code: wc for wc in select(wc for wc in WorkCenter if wc.code in codes)}
+        wc_ids = [wc.id for wc in work_centers.values()]
+        machines_by_wc = {}
+        for existing_machine in select(m for m in Machine if m.work_center.id in wc_ids):
+            machines_by_wc.setdefault(existing_machine.work_center, existing_machine)
+        machine_ids = [m.id for m in machines_by_wc.values()]
+        machines_with_status = set(select(ms.machine for ms in MachineStatus if ms.machine.id in machine_ids))
+
+        # Create work centers and collect operation rows
+        operation_rows = []
         for op in data["Operations"]:
             # Check if work center exists
-            work_center = WorkCenter.get(code=op["Wc/Plant"])
+            work_center = work_centers.get(op["Wc/Plant"])
             if not work_center:
                 work_center = WorkCenter(
                     code=op["Wc/Plant"],
@@ -304,12 +436,13 @@ def save_to_database(data):
                     work_center_name=op["Operation"],
                     description=op["Operation"]
                 )
+                work_centers[work_center.code] = work_center
 
-            # Get all existing machines for this work center
-            existing_machines = select(m for m in Machine if m.work_center == work_center)[:]
+            # Get the first existing machine for this work center
+            machine = machines_by_wc.get(work_center)
 
             # If no machines exist for this work center, create a default one
-            if not existing_machines:
+            if not machine:
                 # Create default machine
                 machine = Machine(
                     work_center=work_center,
@@ -322,6 +455,7 @@ def save_to_database(data):
                     calibration_date=datetime(2024, 1, 1),  # Default calibration date
                     last_maintenance_date=datetime(2024, 1, 1)  # Default maintenance date
                 )
+                machines_by_wc[work_center] = machine
 
                 # Create default machine status
                 MachineStatus(
@@ -330,6 +464,7 @@ def save_to_database(data):
                     description="Machine is operational",
                     available_from=datetime(2025, 1, 21, 11, 41, 20, 417587)  # Hardcoded as requested
                 )
+                machines_with_status.add(machine)
 
                 # Create default machine shift
                 MachineShift(
@@ -339,29 +474,32 @@ def save_to_database(data):
                     is_active=True
                 )
             else:
-                # Use the first existing machine
-                machine = existing_machines[0]
-
                 # Check if machine status exists, if not create it
-                existing_status = select(ms for ms in MachineStatus if ms.machine == machine).first()
-                if not existing_status:
+                if machine not in machines_with_status:
                     MachineStatus(
                         machine=machine,
                         status=default_status_on,
                         description="Machine is operational",
                         available_from=datetime(2025, 1, 21, 11, 41, 20, 417587)  # Hardcoded as requested
                     )
+                    machines_with_status.add(machine)
+
+            # Queue a new operation specific to this order
+            operation_rows.append((
+                work_center,
+                machine,
+                int(op["Oprn No"]),
+                op["Operation"],
+                float(op["Setup Time"]),
+                float(op["Per Pc Time"])
+            ))
 
-            # Create a new operation specific to this order
-            operation = Operation(
-                order=master_order,
-                work_center=work_center,
-                machine=machine,
-                operation_number=int(op["Oprn No"]),
-                operation_description=op["Operation"],
-                setup_time=float(op["Setup Time"]),
-                ideal_cycle_time=float(op["Per Pc Time"])
-            )
+        # Insert all operations in one statement; flush first so the order, work centers and machines have ids
+        flush()
+        _insert_operations(
+            master_order.id,
+            [(work_center.id, machine.id, *values) for work_center, machine, *values in operation_rows]
+        )
 
         return master_order
 
@@ -370,48 +508,46 @@ def save_to_database(data):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from fastapi import HTTPException
-from pony.orm import db_session, select
-
-# Create a thread pool executor for database operations
-executor = ThreadPoolExecutor(max_workers=10)
-
-
-@router.get("/all_orders")
+@router.get("/all_orders", response_class=ORJSONResponse)
 async def get_all_orders():
     try:
         # Run the database query in a thread pool to avoid blocking
         def get_orders_sync():
             with db_session:
-                orders = select(o for o in Order)[:]
+                # One joined query returning plain tuples instead of loading entities and their projects
+                rows = select(
+                    (o.id, o.production_order, o.sale_order, o.wbs_element, o.part_number,
+                     o.part_description, o.total_operations, o.required_quantity, o.launched_quantity,
+                     o.plant_id, o.project.id, o.project.name, o.project.priority, o.project.delivery_date)
+                    for o in Order
+                )[:]
                 return [
                     {
-                        "id": order.id,
-                        "production_order": order.production_order,
-                        "sale_order": order.sale_order,
-                        "wbs_element": order.wbs_element,
-                        "part_number": order.part_number,
-                        "part_description": order.part_description,
-                        "total_operations": order.total_operations,
-                        "required_quantity": order.required_quantity,
-                        "launched_quantity": order.launched_quantity,
-                        "plant_id": order.plant_id,
+                        "id": order_id,
+                        "production_order": production_order,
+                        "sale_order": sale_order,
+                        "wbs_element": wbs_element,
+                        "part_number": part_number,
+                        "part_description": part_description,
+                        "total_operations": total_operations,
+                        "required_quantity": required_quantity,
+                        "launched_quantity": launched_quantity,
+                        "plant_id": plant_id,
                         "project": {
-                            "id": order.project.id,
-                            "name": order.project.name,
-                            "priority": order.project.priority,
-                            "delivery_date": order.project.delivery_date
-                        } if order.project else None
+                            "id": project_id,
+                            "name": project_name,
+                            "priority": project_priority,
+                            "delivery_date": project_delivery_date
+                        }
                     }
-                    for order in orders
+                    for (order_id, production_order, sale_order, wbs_element, part_number,
+                         part_description, total_operations, required_quantity, launched_quantity,
+                         plant_id, project_id, project_name, project_priority, project_delivery_date) in rows
                 ]
 
-        # Execute the database operation in a thread pool
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(executor, get_orders_sync)
-        return result
+        # Execute the database operation in the shared worker pool (sized by THREAD_POOL_SIZE)
+        result = await run_in_threadpool(get_orders_sync)
+        return ORJSONResponse(result)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -432,11 +568,14 @@ async def search_order(
                 )
 
             if part_number:
-                orders = select(o for o in Order if part_number.lower() in o.part_number.lower())[:]
+                query = select(o for o in Order if part_number.lower() in o.part_number.lower())
             elif part_description:
-                orders = select(o for o in Order if part_description.lower() in o.part_description.lower())[:]
+                query = select(o for o in Order if part_description.lower() in o.part_description.lower())
             else:
-                orders = []
+                query = None
+
+            # Load projects, operations and their work centers up front instead of per order
+            orders = query.prefetch(Order.project, Order.operations, Operation.work_center)[:] if query else []
 
             if not orders:
                 return {"orders": []}
@@ -488,10 +627,6 @@ async def search_order(
 @router.put("/update_order/{order_number}")
 async def update_order(order_number: str, update_data: OrderUpdateRequest):
     try:
-        # Convert plant_id to string if it's an integer
-        if isinstance(update_data.plant_id, int):
-            update_data.plant_id = str(update_data.plant_id)
-
         with db_session:
             # Fetch the order by its production_order field
             order = Order.get(production_order=order_number)
@@ -502,7 +637,7 @@ async def update_order(order_number: str, update_data: OrderUpdateRequest):
                 )
 
             # Convert the update_data into a dictionary while excluding unset fields
-            update_dict = update_data.dict(exclude_unset=True)
+            update_dict = update_data.model_dump(exclude_unset=True)
 
             # Validate and convert required_quantity to int
             if 'required_quantity' in update_dict:
@@ -530,10 +665,8 @@ async def update_order(order_number: str, update_data: OrderUpdateRequest):
                             detail=f"Invalid delivery date timestamp: {str(e)}"
                         )
 
-            # Update all remaining fields
-            for field, value in update_dict.items():
-                if hasattr(order, field):
-                    setattr(order, field, value)
+            # Update all remaining fields in one call
+            order.set(**{field: value for field, value in update_dict.items() if hasattr(order, field)})
 
             # Commit the changes
             commit()
@@ -569,8 +702,10 @@ async def update_operation(
                     detail=f"No order found with part number {part_number} and production order {production_order}"
                 )
 
+            # Load the work center with the operation for the machine check below
             operation = select(op for op in Operation
-                               if op.order == order and op.operation_number == operation_number).first()
+                               if op.order == order and op.operation_number == operation_number) \
+                .prefetch(Operation.work_center).first()
             if not operation:
                 raise HTTPException(
                     status_code=404,
@@ -626,12 +761,12 @@ async def create_order(order_data: CreateOrderRequest_new):
     """Create a new order"""
     try:
         with db_session:
-            print(f"DEBUG: Starting order creation for production_order: {order_data.production_order}")
+            logger.debug("Starting order creation for production_order: %s", order_data.production_order)
 
             # Check if order already exists
             existing_order = Order.get(production_order=order_data.production_order)
             if existing_order:
-                print(f"DEBUG: Order already exists with production_order: {order_data.production_order}")
+                logger.debug("Order already exists with production_order: %s", order_data.production_order)
                 raise HTTPException(
                     status_code=400,
                     detail="Production order already exists"
@@ -639,10 +774,10 @@ async def create_order(order_data: CreateOrderRequest_new):
 
             # Current date for project dates
             current_date = datetime.now()
-            print(f"DEBUG: Current date: {current_date}")
+            logger.debug("Current date: %s", current_date)
 
             # Get or create project - Fixed to handle multiple projects
-            print(f"DEBUG: Looking for project with name: {order_data.project_name}")
+            logger.debug("Looking for project with name: %s", order_data.project_name)
 
             # Use select to get all projects with this name
             # existing_projects = list(Project.select(lambda p: p.name == order_data.project_name))
@@ -667,9 +802,9 @@ async def create_order(order_data: CreateOrderRequest_new):
             #     )
             #     print(f"DEBUG: Created new project with priority: {project.priority}")
 
-            print("DEBUG: Creating new project")
+            logger.debug("Creating new project")
             max_priority = select(max(p.priority) for p in Project).first() or 0
-            print(f"DEBUG: Max priority found: {max_priority}")
+            logger.debug("Max priority found: %s", max_priority)
 
             project = Project(
                 name=order_data.project_name,
@@ -679,57 +814,36 @@ async def create_order(order_data: CreateOrderRequest_new):
                 delivery_date=current_date
             )
 
-            print(f"DEBUG: Created new project with priority: {project.priority}")
+            logger.debug("Created new project with priority: %s", project.priority)
 
             # Get or create unit based on user input
-            print(f"DEBUG: Looking for unit with name: {order_data.raw_material_unit_name}")
+            logger.debug("Looking for unit with name: %s", order_data.raw_material_unit_name)
 
-            # Use select to handle potential multiple units
-            existing_units = list(Unit.select(lambda u: u.name == order_data.raw_material_unit_name))
-            print(f"DEBUG: Found {len(existing_units)} existing units with name '{order_data.raw_material_unit_name}'")
+            # Use select().first() to handle potential multiple units without loading them all
+            raw_material_unit = Unit.select(lambda u: u.name == order_data.raw_material_unit_name).first()
 
-            if existing_units:
-                raw_material_unit = existing_units[0]
-                print(f"DEBUG: Using existing unit with ID: {raw_material_unit.id}")
+            if raw_material_unit:
+                logger.debug("Using existing unit with ID: %s", raw_material_unit.id)
             else:
                 raw_material_unit = Unit(name=order_data.raw_material_unit_name)
-                print(f"DEBUG: Created new unit: {order_data.raw_material_unit_name}")
+                logger.debug("Created new unit: %s", order_data.raw_material_unit_name)
 
             # Check if raw material already exists with the same part number
-            print(f"DEBUG: Checking for existing raw material with part number: {order_data.raw_material_part_number}")
-
-            # Use select to handle potential multiple raw materials
-            existing_raw_materials = list(
-                RawMaterial.select(lambda rm: rm.child_part_number == order_data.raw_material_part_number))
-            print(
-                f"DEBUG: Found {len(existing_raw_materials)} existing raw materials with part number '{order_data.raw_material_part_number}'")
+            logger.debug("Checking for existing raw material with part number: %s", order_data.raw_material_part_number)
 
-            if existing_raw_materials:
-                print(f"DEBUG: Raw material already exists with part number: {order_data.raw_material_part_number}")
+            if RawMaterial.exists(child_part_number=order_data.raw_material_part_number):
+                logger.debug("Raw material already exists with part number: %s", order_data.raw_material_part_number)
                 raise HTTPException(
                     status_code=400,
                     detail=f"Raw material with part number '{order_data.raw_material_part_number}' already exists"
                 )
 
             # Get or create default inventory status
-            print("DEBUG: Looking for default inventory status 'Available'")
-
-            # Use select to handle potential multiple statuses
-            existing_statuses = list(InventoryStatus.select(lambda s: s.name == "Available"))
-            print(f"DEBUG: Found {len(existing_statuses)} existing statuses with name 'Available'")
-
-            if existing_statuses:
-                default_status = existing_statuses[0]
-                print(f"DEBUG: Using existing status with ID: {default_status.id}")
-            else:
-                default_status = InventoryStatus(
-                    name="Available",
-                    description="Material is available for use"
-                )
-                print("DEBUG: Created new 'Available' status")
+            default_status = _lookup_id(InventoryStatus, "Available", description="Material is available for use")
+            logger.debug("Using inventory status 'Available' with ID: %s", default_status)
 
             # Create new raw material with user-provided data
-            print("DEBUG: Creating new raw material")
+            logger.debug("Creating new raw material")
             raw_material = RawMaterial(
                 child_part_number=order_data.raw_material_part_number,
                 description=order_data.raw_material_description,
@@ -738,10 +852,10 @@ async def create_order(order_data: CreateOrderRequest_new):
                 status=default_status,
                 available_from=datetime(2024, 1, 2, 9, 0)  # Hardcoded available_from date
             )
-            print(f"DEBUG: Created raw material with part number: {raw_material.child_part_number}")
+            logger.debug("Created raw material with part number: %s", raw_material.child_part_number)
 
             # Create new order
-            print("DEBUG: Creating new order")
+            logger.debug("Creating new order")
             order = Order(
                 production_order=order_data.production_order,
                 sale_order=order_data.sale_order,
@@ -751,73 +865,55 @@ async def create_order(order_data: CreateOrderRequest_new):
                 total_operations=order_data.total_operations,
                 required_quantity=order_data.required_quantity,
                 launched_quantity=order_data.launched_quantity,
-                plant_id=str(order_data.plant_id),  # Convert to string as required by model
+                plant_id=order_data.plant_id,  # Already a string, coerced by the request model
                 project=project,
                 raw_material=raw_material  # Link the raw material to the order
             )
-            print(f"DEBUG: Created order with ID: {order.id}")
+            # Log the production order rather than order.id, which would force a flush to assign the id
+            logger.debug("Created order for production_order: %s", order_data.production_order)
 
             # Create initial 'inactive' status for scheduling
-            print("DEBUG: Creating part schedule status")
-
-            # Use select to check for existing part status
-            existing_part_statuses = list(PartScheduleStatus.select(
-                lambda
-                    ps: ps.part_number == order_data.part_number and ps.production_order == order_data.production_order
-            ))
-            print(f"DEBUG: Found {len(existing_part_statuses)} existing part statuses")
+            logger.debug("Creating part schedule status")
 
-            if not existing_part_statuses:
+            if not PartScheduleStatus.exists(part_number=order_data.part_number,
+                                             production_order=order_data.production_order):
                 part_status = PartScheduleStatus(
                     part_number=order_data.part_number,
                     production_order=order_data.production_order,
                     status='inactive'  # Default to inactive when order is created
                 )
-                print("DEBUG: Created new part schedule status")
+                logger.debug("Created new part schedule status")
             else:
-                print("DEBUG: Part schedule status already exists")
+                logger.debug("Part schedule status already exists")
 
             # Check if there are existing operations for this part number that we should duplicate
-            print(f"DEBUG: Looking for similar orders with part number: {order_data.part_number}")
+            logger.debug("Looking for similar orders with part number: %s", order_data.part_number)
 
             # First, find other orders with the same part number
-            similar_orders = list(
-                select(o for o in Order if o.part_number == order_data.part_number and o.id != order.id))
-            print(f"DEBUG: Found {len(similar_orders)} similar orders")
-
-            # If there are similar orders, duplicate their operations
-            if similar_orders:
-                # Get the first similar order
-                source_order = similar_orders[0]
-                print(f"DEBUG: Using source order ID: {source_order.id} for operation duplication")
-
-                # Get all operations from the source order
-                source_operations = list(select(op for op in Operation if op.order == source_order))
-                print(f"DEBUG: Found {len(source_operations)} operations to duplicate")
-
-                # Duplicate each operation for the new order
-                for i, source_op in enumerate(source_operations):
-                    new_operation = Operation(
-                        order=order,
-                        operation_number=source_op.operation_number,
-                        operation_description=source_op.operation_description,
-                        setup_time=source_op.setup_time,
-                        ideal_cycle_time=source_op.ideal_cycle_time,
-                        work_center=source_op.work_center,
-                        machine=source_op.machine
-                    )
-                    print(f"DEBUG: Duplicated operation {i + 1}/{len(source_operations)}: {source_op.operation_number}")
+            source_order = select(o for o in Order
+                                  if o.part_number == order_data.part_number and o.id != order.id).first()
+
+            # If there are similar orders, duplicate the operations of the first one
+            if source_order:
+                logger.debug("Using source order ID: %s for operation duplication", source_order.id)
+
+                # Get all operations from the source order as plain rows, foreign keys as ids
+                source_operations = _source_operation_rows(source_order)
+                logger.debug("Found %s operations to duplicate", len(source_operations))
+
+                # Duplicate them for the new order in one statement
+                _insert_operations(order.id, source_operations)
 
                 # Update total operations count
                 order.total_operations = len(source_operations)
-                print(f"DEBUG: Updated total operations to: {order.total_operations}")
+                logger.debug("Updated total operations to: %s", order.total_operations)
             else:
-                print("DEBUG: No similar orders found, no operations to duplicate")
+                logger.debug("No similar orders found, no operations to duplicate")
 
-            print("DEBUG: Committing transaction")
+            logger.debug("Committing transaction")
             commit()
 
-            print("DEBUG: Order creation completed successfully")
+            logger.debug("Order creation completed successfully")
             return {
                 "id": order.id,
                 "production_order": order.production_order,
@@ -855,13 +951,10 @@ async def create_order(order_data: CreateOrderRequest_new):
             }
 
     except HTTPException as he:
-        print(f"DEBUG: HTTPException raised: {he.detail}")
+        logger.debug("HTTPException raised: %s", he.detail)
         raise he
     except Exception as e:
-        print(f"DEBUG: Unexpected error: {str(e)}")
-        print(f"DEBUG: Error type: {type(e).__name__}")
-        import traceback
-        print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        logger.exception("Unexpected error creating order: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error creating order: {str(e)}"
@@ -873,9 +966,26 @@ async def create_order(order_data: CreateOrderRequest):
     """Create a new order"""
     try:
         with db_session:
+            # Duplicate check plus the project, part status and source order lookups in one round-trip
+            production_order, project_name, part_number = (
+                order_data.production_order, order_data.project_name, order_data.part_number
+            )
+            orders_table, order_id_column = sql_table(Order), sql_column(Order.id)
+            project_id_column = sql_column(Project.id)
+            order_exists, project_id, part_status_exists, source_order_id = db.select(
+                f"SELECT EXISTS (SELECT 1 FROM {orders_table} "
+                f"WHERE {sql_column(Order.production_order)} = $production_order), "
+                f"(SELECT {project_id_column} FROM {sql_table(Project)} "
+                f"WHERE {sql_column(Project.name)} = $project_name ORDER BY {project_id_column} LIMIT 1), "
+                f"EXISTS (SELECT 1 FROM {sql_table(PartScheduleStatus)} "
+                f"WHERE {sql_column(PartScheduleStatus.part_number)} = $part_number "
+                f"AND {sql_column(PartScheduleStatus.production_order)} = $production_order), "
+                f"(SELECT {order_id_column} FROM {orders_table} "
+                f"WHERE {sql_column(Order.part_number)} = $part_number ORDER BY {order_id_column} LIMIT 1)"
+            )[0]
+
             # Check if order already exists
-            existing_order = Order.get(production_order=order_data.production_order)
-            if existing_order:
+            if order_exists:
                 raise HTTPException(
                     status_code=400,
                     detail="Production order already exists"
@@ -885,7 +995,7 @@ async def create_order(order_data: CreateOrderRequest):
             current_date = datetime.now()
 
             # Get or create project
-            project = Project.get(name=order_data.project_name)
+            project = Project[project_id] if project_id else None
             if not project:
                 max_priority = select(max(p.priority) for p in Project).first() or 0
                 project = Project(
@@ -897,19 +1007,14 @@ async def create_order(order_data: CreateOrderRequest):
                 )
 
             # Get or create default inventory status
-            default_status = InventoryStatus.get(name="Available")
-            if not default_status:
-                default_status = InventoryStatus(
-                    name="Available",
-                    description="Material is available for use"
-                )
+            default_status = _lookup_id(InventoryStatus, "Available", description="Material is available for use")
 
             # Create raw material with hardcoded available_from date
             raw_material = RawMaterial(
                 child_part_number=f"RM-{order_data.part_number}",  # Generate a default part number
                 description=f"Raw Material for {order_data.part_number}",
                 quantity=float(order_data.required_quantity),  # Use required quantity as default
-                unit=Unit.get(name="KG") or Unit(name="KG"),  # Get or create PCS unit
+                unit=_lookup_id(Unit, "KG"),  # Get or create KG unit
                 status=default_status,
                 available_from=datetime(2024, 1, 2, 9, 0)  # Hardcoded available_from date
             )
@@ -924,47 +1029,29 @@ async def create_order(order_data: CreateOrderRequest):
                 total_operations=order_data.total_operations,
                 required_quantity=order_data.required_quantity,
                 launched_quantity=order_data.launched_quantity,
-                plant_id=str(order_data.plant_id),  # Convert to string as required by model
+                plant_id=order_data.plant_id,  # Already a string, coerced by the request model
                 project=project,
                 raw_material=raw_material  # Link the raw material to the order
             )
 
             # Create initial 'inactive' status for scheduling
             # FIX: Updated to use both part_number and production_order
-            part_status = PartScheduleStatus.get(
-                part_number=order_data.part_number,
-                production_order=order_data.production_order
-            )
-            if not part_status:
+            if not part_status_exists:
                 PartScheduleStatus(
                     part_number=order_data.part_number,
                     production_order=order_data.production_order,
                     status='inactive'  # Default to inactive when order is created
                 )
 
-            # Check if there are existing operations for this part number that we should duplicate
-            # First, find other orders with the same part number
-            similar_orders = select(o for o in Order if o.part_number == order_data.part_number and o.id != order.id)[:]
-
-            # If there are similar orders, duplicate their operations
-            if similar_orders:
-                # Get the first similar order
-                source_order = similar_orders[0]
-
-                # Get all operations from the source order
-                source_operations = select(op for op in Operation if op.order == source_order)[:]
-
-                # Duplicate each operation for the new order
-                for source_op in source_operations:
-                    Operation(
-                        order=order,
-                        operation_number=source_op.operation_number,
-                        operation_description=source_op.operation_description,
-                        setup_time=source_op.setup_time,
-                        ideal_cycle_time=source_op.ideal_cycle_time,
-                        work_center=source_op.work_center,
-                        machine=source_op.machine
-                    )
+            # Check if there are existing operations for this part number that we should duplicate,
+            # using the first other order with the same part number found above
+            if source_order_id:
+                source_order = Order[source_order_id]
+                # Get all operations from the source order as plain rows, foreign keys as ids
+                source_operations = _source_operation_rows(source_order)
+
+                # Duplicate them for the new order in one statement
+                _insert_operations(order.id, source_operations)
 
                 # Update total operations count
                 order.total_operations = len(source_operations)
@@ -1102,109 +1189,139 @@ async def search_order(
         production_order: Optional[str] = Query(None, min_length=1)
 ):
     """Get order details by production order number"""
-    try:
-        with db_session:
-            if not production_order:
-                return {"orders": []}
+    if not production_order:
+        return {"orders": []}
 
-            # Exact match search - change from substring match to exact match
-            orders = select(o for o in Order if o.production_order == production_order)[:]
+    # The orders are read and encoded while the response is sent rather than built up front
+    return StreamingResponse(_iter_search_order_json(production_order), media_type="application/json")
 
-            if not orders:
-                # If no exact match found, fall back to partial match as a secondary option
-                orders = select(o for o in Order if production_order.lower() in o.production_order.lower())[:]
 
-            if not orders:
-                return {"orders": []}
+# Operations serialized per chunk when streaming search_order2
+SEARCH_ORDER_STREAM_CHUNK_SIZE = 100
 
-            response_data = {
-                "orders": []
+
+@db_session
+def _iter_search_order_json(production_order):
+    """
+    Yield {"orders": [...]} for the matching orders, each order's fields first and then its operations
+    a chunk at a time. A plain generator, so Starlette advances it in the threadpool; the db_session
+    decorator restores Pony's session on every step, whichever thread runs it.
+    """
+    # Everything the response touches, loaded with the orders instead of per order and operation
+    related = (Order.project, Order.raw_material, RawMaterial.unit, RawMaterial.status,
+               Order.operations, Operation.work_center, Operation.machine, WorkCenter.machines)
+
+    # Exact match search - change from substring match to exact match
+    orders = select(o for o in Order if o.production_order == production_order).prefetch(*related)[:]
+
+    if not orders:
+        # If no exact match found, fall back to partial match as a secondary option
+        orders = select(o for o in Order if production_order.lower() in o.production_order.lower()) \
+            .prefetch(*related)[:]
+
+    yield b'{"orders":['
+    for i, order in enumerate(orders):
+        # The order's own fields, left open so its operations can follow
+        head = orjson.dumps(_search_order_data(order))
+        yield (b"," if i else b"") + head[:-1] + b',"operations":['
+
+        operations = list(order.operations)
+        for start in range(0, len(operations), SEARCH_ORDER_STREAM_CHUNK_SIZE):
+            chunk = b",".join(
+                orjson.dumps(_search_operation_data(op))
+                for op in operations[start:start + SEARCH_ORDER_STREAM_CHUNK_SIZE]
+            )
+            yield chunk if start == 0 else b"," + chunk
+        yield b"]}"
+    yield b"]}"
+
+
+def _search_order_data(order):
+    """search_order2 fields of an order, without its operations"""
+    # An order has exactly one raw material, the reverse side of rm.orders
+    raw_materials = [order.raw_material]
+
+    return {
+        "id": order.id,
+        "production_order": order.production_order,
+        "sale_order": order.sale_order,
+        "wbs_element": order.wbs_element,
+        "part_number": order.part_number,
+        "part_description": order.part_description,
+        "total_operations": order.total_operations,
+        "required_quantity": order.required_quantity,
+        "launched_quantity": order.launched_quantity,
+        "plant_id": order.plant_id,
+        "project": {
+            "id": order.project.id,
+            "name": order.project.name,
+            "priority": order.project.priority,
+            "start_date": order.project.start_date,
+            "end_date": order.project.end_date
+        } if order.project else None,
+        "raw_materials": [
+            {
+                "id": raw_material.id,
+                "child_part_number": raw_material.child_part_number,
+                "description": raw_material.description,
+                "quantity": float(raw_material.quantity),
+                "unit": {
+                    "id": raw_material.unit.id,
+                    "name": raw_material.unit.name
+                },
+                "status": {
+                    "id": raw_material.status.id,
+                    "name": raw_material.status.name
+                },
+                "available_from": raw_material.available_from.isoformat() if raw_material.available_from else None
             }
+            for raw_material in raw_materials
+        ]
+    }
 
-            for order in orders:
-                # Get raw materials associated with this order
-                raw_materials = select(rm for rm in RawMaterial if order in rm.orders)[:]
-
-                order_data = {
-                    "id": order.id,
-                    "production_order": order.production_order,
-                    "sale_order": order.sale_order,
-                    "wbs_element": order.wbs_element,
-                    "part_number": order.part_number,
-                    "part_description": order.part_description,
-                    "total_operations": order.total_operations,
-                    "required_quantity": order.required_quantity,
-                    "launched_quantity": order.launched_quantity,
-                    "plant_id": order.plant_id,
-                    "project": {
-                        "id": order.project.id,
-                        "name": order.project.name,
-                        "priority": order.project.priority,
-                        "start_date": order.project.start_date,
-                        "end_date": order.project.end_date
-                    } if order.project else None,
-                    "raw_materials": [
-                        {
-                            "id": raw_material.id,
-                            "child_part_number": raw_material.child_part_number,
-                            "description": raw_material.description,
-                            "quantity": float(raw_material.quantity),
-                            "unit": {
-                                "id": raw_material.unit.id,
-                                "name": raw_material.unit.name
-                            },
-                            "status": {
-                                "id": raw_material.status.id,
-                                "name": raw_material.status.name
-                            },
-                            "available_from": raw_material.available_from.isoformat() if raw_material.available_from else None
-                        }
-                        for raw_material in raw_materials
-                    ],
-                    "operations": [
-                        {
-                            "id": op.id,
-                            "operation_number": op.operation_number,
-                            "operation_description": op.operation_description,
-                            "setup_time": op.setup_time,
-                            "ideal_cycle_time": op.ideal_cycle_time,
-                            "work_center": op.work_center.code if op.work_center else None,
-                            "boolean": op.work_center.is_schedulable,
-                            "primary_machine": {
-                                "id": op.machine.id,
-                                "name": f"{op.machine.make} {op.machine.model}"
-                            } if op.machine else None,
-                            "work_center_machines": [
-                                {
-                                    "id": machine.id,
-                                    "make": machine.make,
-                                    "model": machine.model,
-                                    "type": machine.type
-                                }
-                                for machine in op.work_center.machines
-                            ] if op.work_center else []
-                        }
-                        for op in order.operations
-                    ]
-                }
 
-                response_data["orders"].append(order_data)
+def _search_operation_data(op):
+    """search_order2 entry for one operation, with its work center's machines"""
+    return {
+        "id": op.id,
+        "operation_number": op.operation_number,
+        "operation_description": op.operation_description,
+        "setup_time": _decimal_to_number(op.setup_time),
+        "ideal_cycle_time": _decimal_to_number(op.ideal_cycle_time),
+        "work_center": op.work_center.code if op.work_center else None,
+        "boolean": op.work_center.is_schedulable,
+        "primary_machine": {
+            "id": op.machine.id,
+            "name": f"{op.machine.make} {op.machine.model}"
+        } if op.machine else None,
+        "work_center_machines": [
+            {
+                "id": machine.id,
+                "make": machine.make,
+                "model": machine.model,
+                "type": machine.type
+            }
+            for machine in op.work_center.machines
+        ] if op.work_center else []
+    }
 
-            return response_data
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+def _decimal_to_number(value: Decimal):
+    """Convert a Decimal for orjson the way FastAPI's encoder does: int when whole, else float"""
+    return int(value) if value.as_tuple().exponent >= 0 else float(value)
 
 
 @router.post("/upload-pdf")
 async def upload_pdf(file: UploadFile = File(...)):
     try:
         pdf_content = await file.read()
-        data = extract_oarc_details(io.BytesIO(pdf_content))
+        # Parsing is CPU-bound, so run it in a worker process rather than on the event loop
+        data = await asyncio.get_running_loop().run_in_executor(
+            _pdf_parse_pool(), extract_oarc_details, io.BytesIO(pdf_content)
+        )
 
-        # Convert any non-serializable objects to strings
-        json_compatible_data = json.loads(json.dumps(data, default=str))
-        return json_compatible_data
+        # The parsed OARC holds only strings, lists and dicts, so orjson can encode it directly
+        return ORJSONResponse(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1297,24 +1414,28 @@ async def update_order_priority(order_id: int, priority_data: ProjectPriorityUpd
                     "priority": current_project.priority
                 }
 
-            # Get all projects ordered by priority
-            all_projects = select(p for p in Project).order_by(Project.priority)[:]
+            # The projects in between are shifted with one UPDATE rather than loaded and updated one by one.
+            # The raw UPDATE bypasses Pony's identity map, so pending changes are flushed first and no other
+            # project may be loaded in this session before it runs, or its cached priority would be stale.
+            current_project_id = current_project.id
+            flush()
+            projects, priority, project_id = sql_table(Project), sql_column(Project.priority), sql_column(Project.id)
 
             # Moving to a higher priority (lower number)
             if new_priority < old_priority:
                 # Shift down projects that are between new and old priority (inclusive of new, exclusive of old)
-                for project in all_projects:
-                    if project.id != current_project.id:
-                        if new_priority <= project.priority < old_priority:
-                            project.priority += 1
+                db.execute(
+                    f"UPDATE {projects} SET {priority} = {priority} + 1 "
+                    f"WHERE {priority} >= $new_priority AND {priority} < $old_priority AND {project_id} != $current_project_id"
+                )
 
             # Moving to a lower priority (higher number)
             elif new_priority > old_priority:
                 # Shift up projects that are between old and new priority (exclusive of old, inclusive of new)
-                for project in all_projects:
-                    if project.id != current_project.id:
-                        if old_priority < project.priority <= new_priority:
-                            project.priority -= 1
+                db.execute(
+                    f"UPDATE {projects} SET {priority} = {priority} - 1 "
+                    f"WHERE {priority} > $old_priority AND {priority} <= $new_priority AND {project_id} != $current_project_id"
+                )
 
             # Set the new priority for the current project
             current_project.priority = new_priority
@@ -1359,28 +1480,30 @@ async def get_project_priorities():
             # Get all projects ordered by priority (ascending)
             projects = select(p for p in Project).order_by(Project.priority)[:]
 
+            # One status per part number in a single query;
+            # min() keeps the row the old per-order select(...).first() picked
+            status_map = dict(select((ps.part_number, min(ps.status)) for ps in PartScheduleStatus))
+
+            # Order rows for every project in one projected query, grouped by project id
+            orders_by_project = defaultdict(list)
+            for project_id, production_order, part_number, part_description, required_quantity, wbs_element, \
+                    sale_order in select((o.project.id, o.production_order, o.part_number, o.part_description,
+                                          o.required_quantity, o.wbs_element, o.sale_order) for o in Order):
+                orders_by_project[project_id].append({
+                    "production_order": production_order,
+                    "part_number": part_number,
+                    "material_description": part_description,
+                    "quantity": required_quantity,
+                    # Get status from PartScheduleStatus if it exists
+                    "status": status_map.get(part_number) or "unknown",
+                    "wbs_element": wbs_element,
+                    "sales_order": sale_order
+                })
+
             response_data = []
 
             for project in projects:
-                # Get all orders associated with this project
-                orders = select(o for o in Order if o.project == project)[:]
-
-                project_orders = []
-                for order in orders:
-                    # Get status from PartScheduleStatus if it exists
-                    status = select(
-                        ps.status for ps in PartScheduleStatus if ps.part_number == order.part_number).first()
-                    status = status if status else "unknown"
-
-                    project_orders.append({
-                        "production_order": order.production_order,
-                        "part_number": order.part_number,
-                        "material_description": order.part_description,
-                        "quantity": order.required_quantity,
-                        "status": status,
-                        "wbs_element": order.wbs_element,
-                        "sales_order": order.sale_order
-                    })
+                project_orders = orders_by_project[project.id]
 
                 response_data.append({
                     "project_id": project.id,
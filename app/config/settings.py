@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     MINIO_BUCKET_NAME: str = "documents"
     MINIO_SECURE: bool = False
 
+    # Worker threads for sync endpoints and run_in_executor calls; Pony holds one
+    # connection per thread, so keep this below the database's max_connections
+    THREAD_POOL_SIZE: int = 64
+
     class Config:
         env_file = ".env"
         case_sensitive = True
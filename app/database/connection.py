@@ -53,3 +53,21 @@ def connect_to_db():
 
     # Generate mapping after all models are imported
     db.generate_mapping(create_tables=True) 
+
+    # Covering index for the per-operation SUM(quantity_completed)/MAX(end_time) aggregates
+    # used by the order completion checks; created here because Pony cannot declare INCLUDE columns
+    with db_session:
+        conn = db.get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS ix_prodlog_op_end_qty ON scheduling.production_logs ("operation") '
+            'INCLUDE (end_time, quantity_completed)'
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error creating production log index: {e}")
+    finally:
+        cursor.close()
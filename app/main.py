@@ -1,10 +1,14 @@
+import asyncio
 import threading
 import time
 import psutil
+from concurrent.futures import ThreadPoolExecutor
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from .config.settings import settings
 from .database.connection import connect_to_db
 from .routes import hr_routes, finance_routes, master_order_routes, pokayoke
 from .api.v1.endpoints import document_management, inventoryv1, priority_scheduling, pdc, operator_log
@@ -16,7 +20,8 @@ from .api.v1.endpoints import auth, planning, mpp, operations, scheduled, dynami
 from .api.v1.endpoints import notification_service,simple_notifications
 
 
-app = FastAPI(title="BEL MES API")
+# Encode dict responses with orjson; FastAPI still runs jsonable_encoder before rendering
+app = FastAPI(title="BEL MES API", default_response_class=ORJSONResponse)
 
 
 # Add CORS middleware
@@ -38,6 +43,18 @@ async def startup_event():
         print(f"Error connecting to database: {str(e)}")
         raise e
 
+    # One thread pool size for both sync endpoints (anyio) and run_in_executor(None, ...)
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREAD_POOL_SIZE
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.THREAD_POOL_SIZE, thread_name_prefix="db")
+    )
+
+
+# Stop the OARC parsing worker processes on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    planning.shutdown_pdf_parse_pool()
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(operator_login.router)
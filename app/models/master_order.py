@@ -9,7 +9,7 @@ from ..database.connection import db  # Import the shared db instance
 class WorkCenter(db.Entity):
     _table_ = ("master_order", "WorkCenter")
     id = PrimaryKey(int, auto=True)
-    code = Required(str)
+    code = Required(str, index=True)  # Looked up by code when saving OARCs and creating or updating operations
     plant_id = Required(str)
     work_center_name = Optional(str)  # Renamed from 'operation'
     description = Optional(str)
@@ -95,7 +95,7 @@ class Order(db.Entity):
     production_order = Required(str, unique=True)
     sale_order = Optional(str)
     wbs_element = Optional(str)
-    part_number = Required(str)
+    part_number = Required(str, index=True)  # Similar-order lookups when creating orders
     part_description = Optional(str)
     total_operations = Required(int)
     required_quantity = Required(int)
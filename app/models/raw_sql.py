@@ -0,0 +1,25 @@
+"""
+Table and column names for the few statements that run as raw SQL instead of through Pony.
+
+Pony issues one statement per INSERT and per lookup, so the hot paths that need a multi-row
+INSERT, several EXISTS/scalar lookups in one SELECT, or a ranged UPDATE use db.select/db.execute.
+Their names are read from the entity mappings here rather than spelled out in the endpoints,
+so renaming a table or column in an entity definition carries over to the raw statements.
+"""
+from ..database.connection import db
+
+
+def sql_table(entity) -> str:
+    """Quoted, schema-qualified table name of an entity"""
+    return db.provider.quote_name(entity._table_)
+
+
+def sql_column(attr) -> str:
+    """Quoted column name of a single-column entity attribute"""
+    column, = attr.columns
+    return db.provider.quote_name(column)
+
+
+def sql_columns(*attrs) -> str:
+    """Comma-separated quoted column names, for INSERT column lists"""
+    return ", ".join(sql_column(attr) for attr in attrs)
@@ -12,6 +12,7 @@ class PartScheduleStatus(db.Entity):
     status = Required(str, default='inactive')  # 'active' or 'inactive'
     created_at = Required(datetime, default=datetime.utcnow)
     updated_at = Required(datetime, default=datetime.utcnow)
+    composite_index(part_number, production_order)  # Lookups by part number, or part number and order
 
     def before_update(self):
         self.updated_at = datetime.utcnow()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, BeforeValidator
+from typing import Optional, List, Dict, Any, Annotated
 from datetime import datetime
 
 class OrderUpdateRequest(BaseModel):
@@ -61,6 +61,15 @@ class OrderUpdateResponse(BaseModel):
         from_attributes = True
 
 
+def _plant_id_to_str(value):
+    # Order.plant_id is a string, but clients send the plant as a number; anything else is left for pydantic to reject
+    return str(value) if isinstance(value, int) and not isinstance(value, bool) else value
+
+
+# Plant id accepted as an int or a string and stored as a string
+PlantId = Annotated[str, BeforeValidator(_plant_id_to_str)]
+
+
 # Request model for creating new order
 class CreateOrderRequest(BaseModel):
     production_order: str
@@ -71,7 +80,7 @@ class CreateOrderRequest(BaseModel):
     total_operations: int
     required_quantity: int
     launched_quantity: int
-    plant_id: int
+    plant_id: PlantId
     project_name: str
 
 
@@ -204,7 +213,7 @@ class CreateOrderRequest_new(BaseModel):
     total_operations: int
     required_quantity: int
     launched_quantity: int
-    plant_id: int
+    plant_id: PlantId
     project_name: str
 
     # Raw material fields